@@ -0,0 +1,136 @@
+"""Async counterparts of the crud functions for the FastAPI handlers.
+
+Each function runs the matching ``crud`` function on the AsyncSession's
+underlying sync Session via ``run_sync``, so the query logic lives in one
+place while the event loop stays free during database I/O. Results are
+converted to schemas inside that call: relationships must be loaded there,
+because lazy loads cannot happen once control is back on the event loop.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from . import crud, schemas
+from .downsampling import lttb
+
+def _goal_schema(db_goal) -> Optional[schemas.Goal]:
+    return schemas.Goal.model_validate(db_goal) if db_goal is not None else None
+
+async def get_goal(db: AsyncSession, goal_id: int, entries_limit: Optional[int] = None) -> Optional[schemas.Goal]:
+    def _get(session):
+        return _goal_schema(crud.get_goal(session, goal_id, entries_limit=entries_limit))
+    return await db.run_sync(_get)
+
+async def get_goals(db: AsyncSession, **filters) -> List[schemas.Goal]:
+    def _list(session):
+        return [_goal_schema(goal) for goal in crud.get_goals(session, **filters)]
+    return await db.run_sync(_list)
+
+async def get_goals_page(db: AsyncSession, page_size: int, **filters) -> Tuple[List[schemas.Goal], Optional[str]]:
+    def _page(session):
+        goals, next_cursor = crud.get_goals_page(session, page_size, **filters)
+        return [_goal_schema(goal) for goal in goals], next_cursor
+    return await db.run_sync(_page)
+
+async def get_goal_summaries(db: AsyncSession, limit: int = 100):
+    return await db.run_sync(crud.get_goal_summaries, limit)
+
+async def search_goals(db: AsyncSession, **filters):
+    return await db.run_sync(crud.search_goals, **filters)
+
+async def stream_goals(db: AsyncSession, chunk_size: int = 500) -> AsyncIterator[dict]:
+    """Yield every goal as a dict, fetched from a server-side cursor in chunks"""
+    result = await db.stream(crud.goal_export_statement().execution_options(yield_per=chunk_size))
+    async for row in result.mappings():
+        yield dict(row)
+
+async def create_goal(db: AsyncSession, goal: schemas.GoalCreate) -> schemas.Goal:
+    def _create(session):
+        return _goal_schema(crud.create_goal(session, goal))
+    return await db.run_sync(_create)
+
+async def insert_goals(db: AsyncSession, goals: List[schemas.GoalCreate]) -> int:
+    return await db.run_sync(crud.insert_goals, goals)
+
+async def update_goal(db: AsyncSession, goal_id: int, goal_update: schemas.GoalUpdate) -> Optional[schemas.Goal]:
+    def _update(session):
+        return _goal_schema(crud.update_goal(session, goal_id, goal_update))
+    return await db.run_sync(_update)
+
+async def update_goal_progress(db: AsyncSession, goal_id: int, progress: float) -> Optional[schemas.Goal]:
+    def _update(session):
+        return _goal_schema(crud.update_goal_progress(session, goal_id, progress))
+    return await db.run_sync(_update)
+
+async def get_goals_by_ids(db: AsyncSession, goal_ids: List[int], entries_limit: Optional[int] = None) -> List[schemas.Goal]:
+    def _list(session):
+        return [_goal_schema(goal) for goal in crud.get_goals_by_ids(session, goal_ids, entries_limit)]
+    return await db.run_sync(_list)
+
+async def get_goal_titles(db: AsyncSession, goal_ids: List[int]) -> Dict[int, str]:
+    return await db.run_sync(crud.get_goal_titles, goal_ids)
+
+async def get_goal_categories(db: AsyncSession, goal_ids: List[int]) -> Dict[int, Optional[str]]:
+    return await db.run_sync(crud.get_goal_categories, goal_ids)
+
+async def record_progress(
+    db: AsyncSession,
+    progress: schemas.ProgressEntryCreate
+) -> Tuple[schemas.ProgressEntry, schemas.GoalSummary]:
+    """The new entry and the goal's updated fields (without its progress entries)"""
+    def _record(session):
+        db_progress, db_goal = crud.record_progress(session, progress)
+        return (
+            schemas.ProgressEntry.model_validate(db_progress),
+            schemas.GoalSummary.model_validate(db_goal, from_attributes=True)
+        )
+    return await db.run_sync(_record)
+
+async def record_progress_batch(db: AsyncSession, entries: List[schemas.ProgressEntryCreate]) -> List[schemas.ProgressEntry]:
+    def _record(session):
+        return [
+            schemas.ProgressEntry.model_validate(db_entry)
+            for db_entry in crud.record_progress_batch(session, entries)
+        ]
+    return await db.run_sync(_record)
+
+async def create_progress_entry(db: AsyncSession, progress: schemas.ProgressEntryCreate) -> schemas.ProgressEntry:
+    def _create(session):
+        return schemas.ProgressEntry.model_validate(crud.create_progress_entry(session, progress))
+    return await db.run_sync(_create)
+
+async def delete_goal(db: AsyncSession, goal_id: int) -> bool:
+    return await db.run_sync(crud.delete_goal, goal_id)
+
+async def delete_goals(db: AsyncSession, **filters) -> list:
+    """Rows (id, status, category, progress_percentage) of the deleted goals"""
+    return await db.run_sync(crud.delete_goals, **filters)
+
+async def get_progress_history(
+    db: AsyncSession,
+    goal_id: int,
+    max_points: Optional[int] = None,
+    **filters
+) -> Optional[schemas.GoalHistory]:
+    """A goal's progress series, downsampled to at most ``max_points`` points; None if the goal is missing"""
+    def _history(session):
+        rows = crud.get_progress_history(session, goal_id, **filters)
+        if rows is None:
+            return None
+        kept = rows
+        if max_points is not None:
+            indices = lttb([row.timestamp.replace(tzinfo=timezone.utc).timestamp() for row in rows], [row.value for row in rows], max_points)
+            kept = [rows[index] for index in indices]
+        return schemas.GoalHistory(
+            goal_id=goal_id,
+            bucket=filters.get("bucket"),
+            total_points=len(rows),
+            points=[schemas.HistoryPoint.model_validate(row._mapping) for row in kept]
+        )
+    return await db.run_sync(_history)
+
+async def get_goal_statistics(db: AsyncSession) -> dict:
+    return await db.run_sync(crud.get_goal_statistics)
+
+async def rebuild_statistics(db: AsyncSession) -> dict:
+    return await db.run_sync(crud.rebuild_statistics)
@@ -0,0 +1,172 @@
+"""Pub/sub backends that carry broadcasts between worker processes.
+
+``ConnectionManager.broadcast`` publishes each event once through a backend;
+every worker subscribed to the backend receives it and fans it out to its
+own WebSocket clients.
+
+- ``InProcessBackend`` delivers straight back to the publishing process.
+  This is the default and is all a single worker needs.
+- ``UnixSocketBackend`` connects the workers on one host (``uvicorn
+  --workers N`` or containers sharing a volume) without an outside
+  service. Each worker binds a Unix datagram socket in a shared directory
+  and a publish sends one datagram to every socket found there. A worker
+  whose datagram could not be sent is told to resync instead (see
+  ``RESYNC_REQUIRED``), since it has no other way to learn it missed one.
+"""
+
+from typing import Awaitable, Callable, Optional, Set
+import asyncio
+import glob
+import json
+import os
+import socket
+import uuid
+
+from .event_encoding import encode_json
+
+BROADCAST_BACKEND = os.getenv("BROADCAST_BACKEND", "memory")
+BROADCAST_SOCKET_DIR = os.getenv("BROADCAST_SOCKET_DIR", "/tmp/goal-tracker-broadcast")
+
+# Largest event a datagram can carry; other workers get RESYNC_REQUIRED for bigger ones
+MAX_DATAGRAM_SIZE = int(os.getenv("BROADCAST_MAX_DATAGRAM_SIZE", str(4 * 1024 * 1024)))
+
+# Called with (data, topics) for every published event
+Deliver = Callable[[dict, list], Awaitable[None]]
+
+# Delivered in place of events a worker missed: its clients must reload
+# and its cached responses may be stale
+RESYNC_REQUIRED = {"type": "resync_required", "data": {}}
+
+class BroadcastBackend:
+    """Interface for carrying published events to every worker"""
+
+    # True when every subscriber lives in this process
+    is_local = True
+
+    async def start(self, deliver: Deliver):
+        """Begin receiving events; ``deliver`` fans each one out locally"""
+        raise NotImplementedError
+
+    async def publish(self, data: dict, topics: list):
+        """Send an event to every worker, including this one"""
+        raise NotImplementedError
+
+    async def stop(self):
+        """Stop receiving events and release resources"""
+
+class InProcessBackend(BroadcastBackend):
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    async def publish(self, data: dict, topics: list):
+        if self._deliver is not None:
+            await self._deliver(data, topics)
+
+class UnixSocketBackend(BroadcastBackend):
+    """Fan events out to all workers on this host over Unix datagram sockets.
+
+    Sockets left behind by workers that have exited are removed the first
+    time a publish finds nobody listening on them. When a datagram cannot be
+    sent (the receiver's buffer is full or the event is too large) the
+    receiver is sent ``RESYNC_REQUIRED`` instead, retried before the next
+    publish to it until it gets through.
+    """
+
+    is_local = False
+
+    def __init__(self, socket_dir: str = BROADCAST_SOCKET_DIR):
+        self.socket_dir = socket_dir
+        self.path = os.path.join(socket_dir, f"worker-{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        self.send_errors = 0
+        self._sock: Optional[socket.socket] = None
+        self._deliver: Optional[Deliver] = None
+        # Peers that missed an event and have not been told to resync yet
+        self._lost_peers: Set[str] = set()
+        # Deliveries in progress; the event loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def start(self, deliver: Deliver):
+        os.makedirs(self.socket_dir, exist_ok=True)
+        self._deliver = deliver
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, MAX_DATAGRAM_SIZE)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, MAX_DATAGRAM_SIZE)
+        self._sock.bind(self.path)
+        self._sock.setblocking(False)
+        asyncio.get_running_loop().add_reader(self._sock.fileno(), self._on_readable)
+
+    def _on_readable(self):
+        while True:
+            try:
+                datagram = self._sock.recv(MAX_DATAGRAM_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            try:
+                message = json.loads(datagram)
+            except ValueError:
+                continue
+            task = asyncio.create_task(self._deliver(message["data"], message.get("topics", [])))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def publish(self, data: dict, topics: list):
+        datagram = encode_json({"data": data, "topics": list(topics)}).encode()
+        peers = glob.glob(os.path.join(self.socket_dir, "worker-*.sock"))
+        for peer in peers:
+            # A peer that missed an event must hear so before it sees a newer one
+            if peer in self._lost_peers and not self._send(_RESYNC_DATAGRAM, peer):
+                continue
+            self._lost_peers.discard(peer)
+            if self._send(datagram, peer):
+                continue
+            self.send_errors += 1
+            if peer == self.path:
+                await self._deliver(data, topics)
+            elif not self._send(_RESYNC_DATAGRAM, peer):
+                self._lost_peers.add(peer)
+
+    def _send(self, datagram: bytes, peer: str) -> bool:
+        """Send one datagram; False if it did not go out (a gone peer counts as sent)"""
+        try:
+            self._sock.sendto(datagram, peer)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # The worker behind this socket is gone
+            _unlink_quietly(peer)
+            self._lost_peers.discard(peer)
+        except OSError:
+            # Receiver's buffer is full or the event is too large for a datagram
+            return False
+        return True
+
+    async def stop(self):
+        if self._sock is not None:
+            asyncio.get_running_loop().remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+        for task in list(self._tasks):
+            task.cancel()
+        _unlink_quietly(self.path)
+
+BACKENDS = {
+    "memory": InProcessBackend,
+    "unix": UnixSocketBackend,
+}
+
+def create_backend(name: str = BROADCAST_BACKEND) -> BroadcastBackend:
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown broadcast backend: {name}")
+
+_RESYNC_DATAGRAM = encode_json({"data": RESYNC_REQUIRED, "topics": []}).encode()
+
+def _unlink_quietly(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
@@ -0,0 +1,43 @@
+"""Helpers for the streaming bulk import and export endpoints"""
+
+from fastapi import Request
+from datetime import date, datetime
+from typing import Any, AsyncIterator
+import json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+async def iter_request_items(request: Request) -> AsyncIterator[Any]:
+    """Yield JSON values from a request body.
+
+    NDJSON bodies (``application/x-ndjson``) are parsed line by line as they
+    arrive, so large imports never sit in memory whole. Any other body must
+    be a single JSON array. Raises ValueError on malformed input.
+    """
+    content_type = request.headers.get("content-type", "")
+    if NDJSON_MEDIA_TYPE not in content_type:
+        items = json.loads(await request.body())
+        if not isinstance(items, list):
+            raise ValueError("Expected a JSON array or an NDJSON body")
+        for item in items:
+            yield item
+        return
+    
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def ndjson_line(item: dict) -> bytes:
+    """Encode one record as an NDJSON line"""
+    return (json.dumps(item, default=_json_default) + "\n").encode()
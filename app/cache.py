@@ -0,0 +1,82 @@
+"""A small in-memory LRU cache with optional expiry.
+
+Bounded by entry count; the least recently used entry is evicted first.
+Safe to share between threads.
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import threading
+import time
+
+_MISSING = object()
+
+class TTLCache:
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        """``max_size`` of 0 disables caching; ``ttl`` is in seconds (None = never expire)"""
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def keys(self) -> list:
+        """A snapshot of the cached keys, least recently used first"""
+        with self._lock:
+            return list(self._entries)
+
+    def __getstate__(self):
+        # Copies (e.g. into a worker process) start empty with the same limits
+        return {"max_size": self.max_size, "ttl": self.ttl}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_size"], state["ttl"])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -1,34 +1,307 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from . import models, schemas
-from typing import List
+from sqlalchemy.orm import Session, aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import DateTime, bindparam, text, func, literal, select, insert, update, delete, tuple_, type_coerce, union_all
+from collections import defaultdict
+from datetime import datetime, timezone
+from . import models, schemas, search_index
+from typing import Dict, Iterator, List, Optional, Tuple
+import base64
+import json
 
-def get_goal(db: Session, goal_id: int):
-    return db.query(models.Goal).filter(models.Goal.id == goal_id).first()
+# Counter keys in the goal_stats table
+STAT_TOTAL = "total"
+STAT_PROGRESS_SUM = "progress_sum"
+STATUS_PREFIX = "status:"
+CATEGORY_PREFIX = "category:"
 
-def get_goals(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Goal).offset(skip).limit(limit).all()
+def get_goal(db: Session, goal_id: int, entries_limit: Optional[int] = None):
+    query = _load_entries(db.query(models.Goal), entries_limit)
+    db_goal = query.filter(models.Goal.id == goal_id).first()
+    if db_goal is not None and entries_limit is not None:
+        _attach_latest_entries(db, [db_goal], entries_limit)
+    return db_goal
+
+def get_goals(
+    db: Session,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    entries_limit: Optional[int] = None
+):
+    """List goals ordered by (created_at, id), starting after the ``after`` key.
+
+    ``entries_limit`` caps the progress entries attached to each goal
+    (None for all of them, 0 for none).
+    """
+    query = _load_entries(db.query(models.Goal), entries_limit)
+    if status is not None:
+        query = query.filter(models.Goal.status == status)
+    if category is not None:
+        query = query.filter(models.Goal.category == category)
+    if after is not None:
+        created_at, goal_id = after
+        # Row-value comparison lets the (created_at, id) index seek straight to the key
+        query = query.filter(tuple_(models.Goal.created_at, models.Goal.id) > tuple_(created_at, goal_id))
+    goals = query.order_by(models.Goal.created_at, models.Goal.id).limit(limit).all()
+    if entries_limit is not None:
+        _attach_latest_entries(db, goals, entries_limit)
+    return goals
+
+# Columns needed to render a dashboard goal card
+SUMMARY_COLUMNS = (
+    models.Goal.id,
+    models.Goal.title,
+    models.Goal.category,
+    models.Goal.status,
+    models.Goal.progress_percentage,
+    models.Goal.updated_at,
+)
+
+def get_goal_summaries(db: Session, limit: int = 100):
+    """Dashboard card data as plain row tuples, bypassing ORM object loading"""
+    stmt = select(*SUMMARY_COLUMNS).order_by(models.Goal.created_at, models.Goal.id).limit(limit)
+    return db.execute(stmt).all()
+
+def goal_export_statement():
+    """Every goal's own columns (no progress entries), in id order"""
+    return select(*models.Goal.__table__.columns).order_by(models.Goal.id)
+
+def _load_entries(query, entries_limit: Optional[int]):
+    """Eager-load every progress entry unless the caller asked for a limit"""
+    if entries_limit is None:
+        return query.options(selectinload(models.Goal.progress_entries))
+    return query
+
+def _attach_latest_entries(db: Session, goals: List[models.Goal], entries_limit: int):
+    """Attach the newest ``entries_limit`` entries to each goal with one window query"""
+    entries_by_goal = defaultdict(list)
+    if entries_limit > 0 and goals:
+        row_number = func.row_number().over(
+            partition_by=models.ProgressEntry.goal_id,
+            order_by=(models.ProgressEntry.created_at.desc(), models.ProgressEntry.id.desc())
+        ).label("row_number")
+        ranked = db.query(models.ProgressEntry, row_number).filter(
+            models.ProgressEntry.goal_id.in_([goal.id for goal in goals])
+        ).subquery()
+        entry = aliased(models.ProgressEntry, ranked)
+        latest = db.query(entry).filter(ranked.c.row_number <= entries_limit).order_by(
+            ranked.c.goal_id, ranked.c.row_number
+        ).all()
+        for db_entry in latest:
+            entries_by_goal[db_entry.goal_id].append(db_entry)
+    
+    for db_goal in goals:
+        set_committed_value(db_goal, "progress_entries", entries_by_goal[db_goal.id])
+
+def get_goals_page(
+    db: Session,
+    page_size: int,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    entries_limit: Optional[int] = None
+):
+    """Fetch one page of goals and the cursor for the page after it"""
+    after = decode_cursor(cursor) if cursor else None
+    goals = get_goals(
+        db,
+        limit=page_size + 1,
+        after=after,
+        status=status,
+        category=category,
+        entries_limit=entries_limit
+    )
+    next_cursor = None
+    if len(goals) > page_size:
+        goals = goals[:page_size]
+        next_cursor = encode_cursor(goals[-1])
+    return goals, next_cursor
+
+def encode_cursor(db_goal: models.Goal) -> str:
+    """Opaque pagination cursor pointing just past ``db_goal``"""
+    key = json.dumps([db_goal.created_at.isoformat(), db_goal.id])
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, goal_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(goal_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
 
 def create_goal(db: Session, goal: schemas.GoalCreate):
     db_goal = models.Goal(**goal.model_dump())
     db.add(db_goal)
+    db.flush()
+    search_index.index_goals(db, [db_goal])
+    _apply_stats_delta(db, new=_goal_state(db_goal))
     db.commit()
     db.refresh(db_goal)
     return db_goal
 
+def insert_goals(db: Session, goals: List[schemas.GoalCreate]) -> int:
+    """Insert a chunk of goals with one multi-row INSERT.
+
+    Does not commit: bulk imports call this once per chunk and commit the
+    whole import as a single transaction.
+    """
+    if not goals:
+        return 0
+    now = datetime.utcnow()
+    rows = [
+        dict(goal.model_dump(), created_at=now, updated_at=now, progress_percentage=0.0, status="active")
+        for goal in goals
+    ]
+    statement = insert(models.Goal).values(rows)
+    if search_index.uses_fts(db):
+        search_index.index_goals(db, db.execute(
+            statement.returning(models.Goal.id, models.Goal.title, models.Goal.description)
+        ).all())
+    else:
+        db.execute(statement)
+    
+    deltas: Dict[str, float] = defaultdict(float)
+    deltas[STAT_TOTAL] = len(rows)
+    deltas[STATUS_PREFIX + "active"] = len(rows)
+    for row in rows:
+        deltas[CATEGORY_PREFIX + (row["category"] or "Uncategorized")] += 1
+    _bump_stats(db, deltas)
+    return len(rows)
+
+def _lock_goals(db: Session, goal_ids) -> Dict[int, models.Goal]:
+    """Load goals for a read-modify-write, locked until the transaction ends.
+
+    Statistics deltas are computed from the state read here, so two
+    overlapping writes to one goal must not both read the same old state.
+    PostgreSQL locks the rows (SELECT ... FOR UPDATE). SQLite has no row
+    locks: a no-op UPDATE first takes the database write lock, so other
+    writers wait (busy_timeout) until this transaction commits, and the
+    state read afterwards is current.
+    """
+    goal_ids = list(goal_ids)
+    query = db.query(models.Goal).filter(models.Goal.id.in_(goal_ids)).populate_existing()
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(
+            text("UPDATE goals SET id = id WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": goal_ids}
+        )
+    else:
+        query = query.with_for_update()
+    return {db_goal.id: db_goal for db_goal in query}
+
 def update_goal_progress(db: Session, goal_id: int, progress: float):
-    db_goal = db.query(models.Goal).filter(models.Goal.id == goal_id).first()
+    db_goal = _lock_goals(db, [goal_id]).get(goal_id)
     if db_goal:
-        db_goal.progress_percentage = min(100.0, max(0.0, progress))
-        if db_goal.progress_percentage >= 100.0:
-            db_goal.status = "completed"
+        old_state = _goal_state(db_goal)
+        _set_goal_progress(db_goal, progress)
+        _apply_stats_delta(db, old=old_state, new=_goal_state(db_goal))
         db.commit()
         db.refresh(db_goal)
     return db_goal
 
+def _set_goal_progress(db_goal: models.Goal, progress: float):
+    """Clamp progress to 0-100 and mark the goal completed once it reaches 100"""
+    db_goal.progress_percentage = min(100.0, max(0.0, progress))
+    if db_goal.progress_percentage >= 100.0:
+        db_goal.status = "completed"
+
+def record_progress(db: Session, progress: schemas.ProgressEntryCreate) -> Tuple[models.ProgressEntry, models.Goal]:
+    """Store a progress entry and the goal's new progress as one unit of work.
+
+    Both rows are flushed and committed together and come back ready to
+    use, so callers do not need to re-query. The goal's progress_entries
+    are never loaded: its cost would grow with the goal's history.
+    Raises LookupError if the goal does not exist.
+    """
+    db_goal = _lock_goals(db, [progress.goal_id]).get(progress.goal_id)
+    if db_goal is None:
+        raise LookupError(f"Goal not found: {progress.goal_id}")
+    
+    old_state = _goal_state(db_goal)
+    # A backdated entry only adds history; it must not roll newer progress back
+    latest = _latest_entry_times(db, [db_goal.id]) if progress.created_at is not None else {}
+    db_progress = models.ProgressEntry(**progress.model_dump(exclude_none=True))
+    db_progress.created_at = _as_naive_utc(progress.created_at) or datetime.utcnow()
+    db.add(db_progress)
+    if db_goal.id not in latest or db_progress.created_at >= latest[db_goal.id]:
+        _set_goal_progress(db_goal, progress.progress_percentage or 0)
+    _apply_stats_delta(db, old=old_state, new=_goal_state(db_goal))
+    db.flush()
+    search_index.index_entries(db, [db_progress])
+    db.commit()
+    return db_progress, db_goal
+
+def record_progress_batch(db: Session, entries: List[schemas.ProgressEntryCreate]) -> List[models.ProgressEntry]:
+    """Store many progress entries and their goal progress in one transaction.
+
+    Entries are applied in timestamp order, so each goal ends at the
+    progress of its latest entry. Entries older than the goal's latest
+    stored entry (e.g. synced offline updates) are kept as history but do
+    not change its progress. Returns the new rows in input order.
+    Raises LookupError if any goal does not exist.
+    """
+    goal_ids = {entry.goal_id for entry in entries}
+    goals = _lock_goals(db, goal_ids)
+    missing = goal_ids - goals.keys()
+    if missing:
+        raise LookupError(f"Goals not found: {sorted(missing)}")
+    
+    old_states = {goal_id: _goal_state(db_goal) for goal_id, db_goal in goals.items()}
+    latest = _latest_entry_times(db, goal_ids)
+    now = datetime.utcnow()
+    timestamps = [_as_naive_utc(entry.created_at) or now for entry in entries]
+    db_entries: List[Optional[models.ProgressEntry]] = [None] * len(entries)
+    for index in sorted(range(len(entries)), key=timestamps.__getitem__):
+        entry = entries[index]
+        db_entry = models.ProgressEntry(**entry.model_dump(exclude_none=True))
+        db_entry.created_at = timestamps[index]
+        db.add(db_entry)
+        if entry.goal_id not in latest or timestamps[index] >= latest[entry.goal_id]:
+            _set_goal_progress(goals[entry.goal_id], entry.progress_percentage or 0)
+        db_entries[index] = db_entry
+    db.flush()
+    search_index.index_entries(db, db_entries)
+    
+    _apply_stats_transitions(db, [
+        (old_states[goal_id], _goal_state(db_goal)) for goal_id, db_goal in goals.items()
+    ])
+    db.commit()
+    return db_entries
+
+def _latest_entry_times(db: Session, goal_ids) -> Dict[int, datetime]:
+    """created_at of each goal's newest stored entry, for goals that have one"""
+    return dict(db.query(
+        models.ProgressEntry.goal_id, func.max(models.ProgressEntry.created_at)
+    ).filter(models.ProgressEntry.goal_id.in_(list(goal_ids))).group_by(models.ProgressEntry.goal_id).all())
+
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC, like datetime.utcnow()"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def get_goals_by_ids(db: Session, goal_ids: List[int], entries_limit: Optional[int] = None):
+    """Load several goals by id with their progress entries batch-loaded"""
+    query = _load_entries(db.query(models.Goal), entries_limit)
+    goals = query.filter(models.Goal.id.in_(goal_ids)).order_by(models.Goal.id).all()
+    if entries_limit is not None:
+        _attach_latest_entries(db, goals, entries_limit)
+    return goals
+
+def get_goal_titles(db: Session, goal_ids: List[int]) -> Dict[int, str]:
+    return dict(db.query(models.Goal.id, models.Goal.title).filter(models.Goal.id.in_(goal_ids)).all())
+
+def get_goal_categories(db: Session, goal_ids: List[int]) -> Dict[int, Optional[str]]:
+    return dict(db.query(models.Goal.id, models.Goal.category).filter(models.Goal.id.in_(goal_ids)).all())
+
 def create_progress_entry(db: Session, progress: schemas.ProgressEntryCreate):
-    db_progress = models.ProgressEntry(**progress.model_dump())
+    db_progress = models.ProgressEntry(**progress.model_dump(exclude_none=True))
     db.add(db_progress)
+    db.flush()
+    search_index.index_entries(db, [db_progress])
     db.commit()
     db.refresh(db_progress)
     return db_progress
@@ -38,48 +311,311 @@ def get_progress_entries(db: Session, goal_id: int):
         models.ProgressEntry.goal_id == goal_id
     ).order_by(models.ProgressEntry.created_at.desc()).all()
 
-def get_goal_statistics(db: Session):
-    total_goals = db.query(models.Goal).count()
-    completed_goals = db.query(models.Goal).filter(models.Goal.status == "completed").count()
-    active_goals = db.query(models.Goal).filter(models.Goal.status == "active").count()
+# Goal fields in the full-text search index
+SEARCHABLE_FIELDS = {"title", "description"}
+
+def search_goals(
+    db: Session,
+    q: Optional[str] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    min_progress: Optional[float] = None,
+    limit: int = 20,
+    offset: int = 0
+) -> list:
+    """Goal summary rows with ``rank`` and ``entry_matches``, best match first.
+
+    ``q`` is matched against goal titles, descriptions and progress entry
+    text through the search index; a goal matches if it or any of its
+    entries does. Filtering, ranking and paging all happen in one query.
+    Without ``q`` the filtered goals come back in creation order.
+    Raises ValueError if ``q`` has no searchable words.
+    """
+    conditions = []
+    if status is not None:
+        conditions.append(models.Goal.status == status)
+    if category is not None:
+        conditions.append(models.Goal.category == category)
+    if min_progress is not None:
+        conditions.append(models.Goal.progress_percentage >= min_progress)
+    
+    if q is None:
+        stmt = select(
+            *SUMMARY_COLUMNS, literal(0.0).label("rank"), literal(0).label("entry_matches")
+        ).where(*conditions).order_by(models.Goal.created_at, models.Goal.id)
+    else:
+        hits = union_all(*search_index.hit_statements(db, q, conditions)).subquery()
+        rank = func.min(hits.c.rank).label("rank")
+        stmt = select(
+            *SUMMARY_COLUMNS, rank, func.sum(hits.c.entry_matches).label("entry_matches")
+        ).join_from(models.Goal, hits, hits.c.goal_id == models.Goal.id).where(*conditions).group_by(
+            *SUMMARY_COLUMNS
+        ).order_by(rank, models.Goal.id)
+    return db.execute(stmt.limit(limit).offset(offset)).all()
+
+HISTORY_BUCKETS = ("day", "week", "month")
+
+def _bucket_start(db: Session, column, bucket: str):
+    """SQL expression for the start of the day/week (Monday)/month containing ``column``"""
+    if db.get_bind().dialect.name == "sqlite":
+        modifiers = {
+            "day": ("start of day",),
+            "week": ("start of day", "weekday 0", "-6 days"),
+            "month": ("start of month",),
+        }[bucket]
+        return type_coerce(func.datetime(column, *modifiers), DateTime)
+    return func.date_trunc(bucket, column)
+
+def get_progress_history(
+    db: Session,
+    goal_id: int,
+    bucket: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Optional[list]:
+    """(timestamp, value, average, count) rows of a goal's scored entries, oldest first.
+
+    Without a bucket every entry is a row. With ``bucket`` ("day", "week" or
+    "month") the entries are aggregated in SQL into one row per bucket: its
+    start, the last value recorded in it, the average and the entry count.
+    Returns None if the goal does not exist.
+    """
+    if bucket is not None and bucket not in HISTORY_BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(HISTORY_BUCKETS)}")
+    if db.query(models.Goal.id).filter(models.Goal.id == goal_id).scalar() is None:
+        return None
     
-    avg_progress = db.query(func.avg(models.Goal.progress_percentage)).scalar() or 0.0
+    entry = models.ProgressEntry
+    conditions = [entry.goal_id == goal_id, entry.progress_percentage.isnot(None)]
+    if start is not None:
+        conditions.append(entry.created_at >= _as_naive_utc(start))
+    if end is not None:
+        conditions.append(entry.created_at <= _as_naive_utc(end))
     
-    # Goals by category
-    category_stats = db.query(
-        models.Goal.category, 
-        func.count(models.Goal.id)
-    ).group_by(models.Goal.category).all()
+    if bucket is None:
+        stmt = select(
+            entry.created_at.label("timestamp"),
+            entry.progress_percentage.label("value"),
+            entry.progress_percentage.label("average"),
+            literal(1).label("count")
+        ).where(*conditions).order_by(entry.created_at, entry.id)
+        return db.execute(stmt).all()
     
-    goals_by_category = {category or "Uncategorized": count for category, count in category_stats}
+    bucket_start = _bucket_start(db, entry.created_at, bucket)
+    ranked = select(
+        bucket_start.label("timestamp"),
+        entry.progress_percentage.label("value"),
+        func.avg(entry.progress_percentage).over(partition_by=bucket_start).label("average"),
+        func.count().over(partition_by=bucket_start).label("count"),
+        func.row_number().over(
+            partition_by=bucket_start,
+            order_by=(entry.created_at.desc(), entry.id.desc())
+        ).label("row_number")
+    ).where(*conditions).subquery()
+    stmt = select(
+        ranked.c.timestamp, ranked.c.value, ranked.c.average, ranked.c["count"]
+    ).where(ranked.c.row_number == 1).order_by(ranked.c.timestamp)
+    return db.execute(stmt).all()
+
+def iter_progress_entry_chunks(db: Session, chunk_size: int = 500) -> Iterator[list]:
+    """Yield (id, text, goal title) rows for every progress entry, ``chunk_size`` at a time.
+
+    Pages by entry id so each chunk is an independent, index-backed query.
+    """
+    last_id = 0
+    while True:
+        rows = db.query(
+            models.ProgressEntry.id, models.ProgressEntry.text, models.Goal.title
+        ).join(models.Goal, models.Goal.id == models.ProgressEntry.goal_id).filter(
+            models.ProgressEntry.id > last_id
+        ).order_by(models.ProgressEntry.id).limit(chunk_size).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+def update_progress_analyses(db: Session, analyses: List[dict]):
+    """Bulk-write sentiment and key_insights for entries by id (no commit).
+
+    Each item has ``id``, ``sentiment`` and ``key_insights``.
+    """
+    if analyses:
+        db.execute(update(models.ProgressEntry), analyses)
+
+def get_goal_statistics(db: Session):
+    """Read dashboard statistics from the goal_stats counters"""
+    counters = dict(db.query(models.GoalStat.key, models.GoalStat.value).all())
+    if STAT_TOTAL not in counters:
+        # Counters have never been built for this database
+        return rebuild_statistics(db)
+    
+    total_goals = int(counters.get(STAT_TOTAL, 0))
+    avg_progress = counters.get(STAT_PROGRESS_SUM, 0.0) / total_goals if total_goals else 0.0
+    
+    goals_by_category = {
+        key[len(CATEGORY_PREFIX):]: int(value)
+        for key, value in counters.items()
+        if key.startswith(CATEGORY_PREFIX) and value > 0
+    }
     
     return {
         "total_goals": total_goals,
-        "completed_goals": completed_goals,
-        "active_goals": active_goals,
+        "completed_goals": int(counters.get(STATUS_PREFIX + "completed", 0)),
+        "active_goals": int(counters.get(STATUS_PREFIX + "active", 0)),
         "average_progress": round(avg_progress, 2),
         "goals_by_category": goals_by_category
     }
+
+def rebuild_statistics(db: Session):
+    """Recompute the goal_stats counters from the goals table"""
+    rows = db.query(
+        models.Goal.status,
+        models.Goal.category,
+        func.count(models.Goal.id),
+        func.coalesce(func.sum(models.Goal.progress_percentage), 0.0)
+    ).group_by(models.Goal.status, models.Goal.category).all()
+    
+    counters = defaultdict(float)
+    counters[STAT_TOTAL] = 0.0
+    counters[STAT_PROGRESS_SUM] = 0.0
+    for status, category, count, progress_sum in rows:
+        counters[STAT_TOTAL] += count
+        counters[STAT_PROGRESS_SUM] += progress_sum
+        counters[STATUS_PREFIX + str(status)] += count
+        counters[CATEGORY_PREFIX + (category or "Uncategorized")] += count
+    
+    db.query(models.GoalStat).delete()
+    db.add_all(models.GoalStat(key=key, value=value) for key, value in counters.items())
+    db.commit()
+    return get_goal_statistics(db)
+
+def ensure_statistics(db: Session):
+    """Build the goal_stats counters if this database has none yet"""
+    if db.get(models.GoalStat, STAT_TOTAL) is None:
+        rebuild_statistics(db)
+
+def _goal_state(db_goal: models.Goal) -> Tuple[Optional[str], Optional[str], Optional[float]]:
+    """The (status, category, progress) triple the statistics depend on"""
+    return (db_goal.status, db_goal.category, db_goal.progress_percentage)
+
+def _apply_stats_delta(db: Session, old: Optional[tuple] = None, new: Optional[tuple] = None):
+    """Move a goal's contribution in goal_stats from ``old`` to ``new``.
+
+    Pass only ``new`` for an inserted goal and only ``old`` for a deleted one.
+    The caller owns the transaction, so the counters commit with the write.
+    """
+    _apply_stats_transitions(db, [(old, new)])
+
+def _apply_stats_transitions(db: Session, transitions: List[Tuple[Optional[tuple], Optional[tuple]]]):
+    """Apply many (old, new) goal state changes to goal_stats in one statement"""
+    deltas: Dict[str, float] = defaultdict(float)
+    for old, new in transitions:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            status, category, progress = state
+            deltas[STAT_TOTAL] += sign
+            deltas[STAT_PROGRESS_SUM] += sign * (progress or 0.0)
+            deltas[STATUS_PREFIX + str(status)] += sign
+            deltas[CATEGORY_PREFIX + (category or "Uncategorized")] += sign
+    
+    _bump_stats(db, {key: delta for key, delta in deltas.items() if delta})
+
+def _bump_stats(db: Session, deltas: Dict[str, float]):
+    """Add each delta to its goal_stats counter, creating missing counters"""
+    if not deltas:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(models.GoalStat).values(
+            [{"key": key, "value": delta} for key, delta in deltas.items()]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.GoalStat.key],
+            set_={"value": models.GoalStat.value + stmt.excluded.value}
+        )
+        db.execute(stmt)
+        return
+    
+    for key, delta in deltas.items():
+        updated = db.query(models.GoalStat).filter(models.GoalStat.key == key).update(
+            {models.GoalStat.value: models.GoalStat.value + delta},
+            synchronize_session=False
+        )
+        if not updated:
+            db.add(models.GoalStat(key=key, value=delta))
+    db.flush()
+
+# Ids per DELETE statement, well under SQLite's bound parameter limit
+DELETE_CHUNK_SIZE = 10000
+
 def delete_goal(db: Session, goal_id: int):
     """Delete a goal and all its progress entries"""
-    db_goal = db.query(models.Goal).filter(models.Goal.id == goal_id).first()
-    if db_goal:
-        # Delete all progress entries first (due to foreign key constraint)
-        db.query(models.ProgressEntry).filter(models.ProgressEntry.goal_id == goal_id).delete()
-        
-        # Delete the goal
-        db.delete(db_goal)
-        db.commit()
-        return True
-    return False
+    return bool(delete_goals(db, ids=[goal_id]))
+
+def delete_goals(
+    db: Session,
+    ids: Optional[List[int]] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None
+) -> list:
+    """Delete every goal matching all the given filters, in one transaction.
+
+    Progress entries go with their goals through ON DELETE CASCADE, so each
+    chunk of ids is a single DELETE ... RETURNING. Returns the (id, status,
+    category, progress_percentage) rows of the deleted goals.
+    """
+    conditions = []
+    if status is not None:
+        conditions.append(models.Goal.status == status)
+    if category is not None:
+        conditions.append(models.Goal.category == category)
+    if ids is None and not conditions:
+        raise ValueError("Refusing to delete goals without a filter")
+    
+    if ids is None:
+        deleted = _delete_goals_where(db, conditions)
+    else:
+        deleted = []
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            chunk = ids[start:start + DELETE_CHUNK_SIZE]
+            deleted.extend(_delete_goals_where(db, [models.Goal.id.in_(chunk), *conditions]))
+    
+    _apply_stats_transitions(db, [((row.status, row.category, row.progress_percentage), None) for row in deleted])
+    db.commit()
+    return deleted
+
+def _delete_goals_where(db: Session, conditions: list) -> list:
+    search_index.unindex_goals(db, conditions)
+    columns = (models.Goal.id, models.Goal.status, models.Goal.category, models.Goal.progress_percentage)
+    if db.get_bind().dialect.delete_returning:
+        statement = delete(models.Goal).where(*conditions).returning(*columns)
+        return db.execute(statement, execution_options={"synchronize_session": False}).all()
+    
+    # No RETURNING support: read the rows first, inside the same transaction
+    deleted = db.execute(select(*columns).where(*conditions)).all()
+    db.execute(delete(models.Goal).where(*conditions), execution_options={"synchronize_session": False})
+    return deleted
 
 def update_goal(db: Session, goal_id: int, goal_update: schemas.GoalUpdate):
     """Update goal details"""
-    db_goal = db.query(models.Goal).filter(models.Goal.id == goal_id).first()
+    db_goal = _lock_goals(db, [goal_id]).get(goal_id)
     if db_goal:
+        old_state = _goal_state(db_goal)
         update_data = goal_update.model_dump(exclude_unset=True)
+        reindex = bool(SEARCHABLE_FIELDS & update_data.keys())
+        if reindex:
+            search_index.unindex_goals(db, [models.Goal.id == goal_id], with_entries=False)
         for field, value in update_data.items():
             setattr(db_goal, field, value)
+        if reindex:
+            db.flush()
+            search_index.index_goals(db, [db_goal])
+        _apply_stats_delta(db, old=old_state, new=_goal_state(db_goal))
         db.commit()
         db.refresh(db_goal)
-    return db_goal
\ No newline at end of file
+    return db_goal
@@ -1,15 +1,197 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from contextlib import contextmanager
 import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
 
 # Database URL - using SQLite for simplicity
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./goals.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
-)
+# Connection pool settings
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# PRAGMAs applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),  # negative = KiB, so 64 MB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # SQLite ignores foreign keys (and ON DELETE CASCADE) unless enabled per connection
+    "foreign_keys": "ON",
+}
+
+class PoolMetrics:
+    """Checkout counters and wait times for one engine's connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connections_opened = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            stats = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connections_opened": self.connections_opened,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_seconds_total / waits * 1000, 3) if waits else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "idle": pool.checkedin(),
+            })
+        return stats
+
+def _timed_pool_class(base, metrics: PoolMetrics):
+    """Subclass ``base`` so every checkout records how long it waited.
+
+    Pools rebuild themselves through ``self.__class__`` on dispose, so the
+    metrics object is bound to the class rather than to a pool instance.
+    """
+    class TimedPool(base):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                metrics.record_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            metrics.record_wait(time.perf_counter() - start)
+            return connection
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _is_memory_sqlite(url: str) -> bool:
+    return _is_sqlite(url) and (url.split("://", 1)[-1] in ("", "/", "/:memory:") or "mode=memory" in url)
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def create_db_engine(url: str, async_engine: bool = False):
+    """Build a sync or async engine with the configured pool and SQLite tuning.
+
+    Returns the engine and the PoolMetrics that its pool reports into.
+    """
+    metrics = PoolMetrics()
+    kwargs = {}
+    if _is_sqlite(url):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if not _is_memory_sqlite(url):
+        base_pool = AsyncAdaptedQueuePool if async_engine else QueuePool
+        kwargs.update(
+            poolclass=_timed_pool_class(base_pool, metrics),
+            pool_size=POOL_SIZE,
+            max_overflow=POOL_MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE,
+            pool_pre_ping=POOL_PRE_PING,
+        )
+
+    db_engine = create_async_engine(url, **kwargs) if async_engine else create_engine(url, **kwargs)
+    sync_engine = db_engine.sync_engine if async_engine else db_engine
+
+    if _is_sqlite(url):
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+
+    @event.listens_for(sync_engine, "connect")
+    def _count_connect(dbapi_connection, connection_record):
+        metrics.connections_opened += 1
+
+    @event.listens_for(sync_engine, "checkout")
+    def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.checkouts += 1
+
+    @event.listens_for(sync_engine, "checkin")
+    def _count_checkin(dbapi_connection, connection_record):
+        metrics.checkins += 1
+
+    return db_engine, metrics
+
+engine, sync_pool_metrics = create_db_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+# Async drivers for the same database, used by the FastAPI handlers
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its async counterpart"""
+    scheme, sep, rest = url.partition("://")
+    backend = scheme.split("+", 1)[0]
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database URL: {url}")
+    return ASYNC_DRIVERS[backend] + sep + rest
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(SQLALCHEMY_DATABASE_URL)
+
+async_engine, async_pool_metrics = create_db_engine(ASYNC_DATABASE_URL, async_engine=True)
+
+# expire_on_commit=False: results are used after commit without another round trip
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def get_pool_metrics() -> dict:
+    """Pool checkout and wait statistics for both engines"""
+    return {
+        "sync": sync_pool_metrics.snapshot(engine.pool),
+        "async": async_pool_metrics.snapshot(async_engine.pool),
+    }
+
+# Serializes schema setup when several worker processes start together
+INIT_LOCK_PATH = os.getenv("DB_INIT_LOCK", os.path.join(tempfile.gettempdir(), "goal-tracker-db-init.lock"))
+
+@contextmanager
+def init_lock(path: str = INIT_LOCK_PATH):
+    """Hold an exclusive lock across processes on this host (no-op without fcntl)"""
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+Base = declarative_base()
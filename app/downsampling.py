@@ -0,0 +1,52 @@
+"""Reduce a time series to a fixed number of points for charting.
+
+Uses Largest-Triangle-Three-Buckets (Steinarsson, 2013). The series is split
+into ``threshold - 2`` equal buckets between its first and last point, and
+each bucket keeps the point forming the largest triangle with the point kept
+before it and the average of the next bucket. Peaks and dips survive, which
+plain every-Nth sampling would skip over.
+"""
+
+from typing import List, Sequence
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Indices of the points to keep, in order; ``xs`` must be ascending.
+
+    The first and last points are always kept. Series that already fit in
+    ``threshold`` points (or a threshold below 3) are returned whole.
+    """
+    count = len(xs)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+
+    kept = [0]
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Average of the following bucket (just the last point for the final bucket)
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        if next_start >= next_end:
+            next_start, next_end = count - 1, count
+        span = next_end - next_start
+        average_x = sum(xs[next_start:next_end]) / span
+        average_y = sum(ys[next_start:next_end]) / span
+
+        previous_x, previous_y = xs[previous], ys[previous]
+        best, best_area = start, -1.0
+        for index in range(start, end):
+            # Twice the triangle's area; the factor does not change the winner
+            area = abs(
+                (previous_x - average_x) * (ys[index] - previous_y)
+                - (previous_x - xs[index]) * (average_y - previous_y)
+            )
+            if area > best_area:
+                best, best_area = index, area
+        kept.append(best)
+        previous = best
+
+    kept.append(count - 1)
+    return kept
@@ -0,0 +1,143 @@
+"""Merge bursts of broadcast events before they are published.
+
+With a coalescing window, ``ConnectionManager.broadcast`` hands events to an
+``EventCoalescer`` instead of publishing them straight away. Events about the
+same goal that arrive within the window are merged into one carrying the
+latest state, and the pending events are published together when the window
+closes.
+
+Merge rules for one goal:
+  - ``goal_created`` followed by updates stays ``goal_created`` with the
+    changes applied to the goal and any new progress entries attached
+  - ``goal_updated`` and ``progress_updated`` deltas combine their changes
+    (later values win) and their entries (newest first)
+  - ``goal_deleted`` replaces anything pending for the goal, and cancels
+    out a ``goal_created`` from the same window altogether
+
+``stats_updated`` keeps only the latest statistics and ``goals_imported``
+adds up the counts. Other events are published unchanged.
+
+A merged event moves to the position of its latest part, so every client
+sees each goal's events in order and never an older state after a newer one.
+Events about many goals at once (``progress_batch_updated``,
+``goals_deleted``) never merge; a pending event about any of their goals is
+closed off where it is, and later events about that goal start a new one
+after them.
+"""
+
+from collections import OrderedDict
+from itertools import count
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import os
+
+# Coalescing window in milliseconds; 0 publishes every event immediately
+COALESCE_WINDOW_MS = float(os.getenv("WS_COALESCE_WINDOW_MS", "0"))
+
+GOAL_EVENTS = ("goal_created", "goal_updated", "progress_updated", "goal_deleted")
+DELTA_EVENTS = ("goal_updated", "progress_updated")
+
+Publish = Callable[[dict, list], Awaitable[None]]
+
+class EventCoalescer:
+    def __init__(self, publish: Publish, window_ms: float = COALESCE_WINDOW_MS):
+        self.publish = publish
+        self.window = window_ms / 1000
+        self.received = 0
+        self.published = 0
+        # Pending events in publish order, by slot number
+        self._pending: "OrderedDict[int, Tuple[dict, List[str]]]" = OrderedDict()
+        # merge key -> slot of the pending event later events with that key merge into
+        self._open: Dict[object, int] = {}
+        self._slots = count()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def add(self, data: dict, topics: List[str]):
+        """Queue an event, merging it with a pending one about the same goal"""
+        self.received += 1
+        key = merge_key(data)
+        if key is None:
+            # Must not overtake anything pending about its goals, nor be overtaken by it
+            for goal_id in touched_goals(data):
+                self._open.pop(("goal", goal_id), None)
+            self._pending[next(self._slots)] = (data, list(topics))
+        else:
+            slot = self._open.pop(key, None)
+            pending = self._pending.pop(slot) if slot is not None else None
+            if pending is None:
+                pending = (data, list(topics))
+            else:
+                merged = merge_events(pending[0], data)
+                pending = None if merged is None else (merged, _union(pending[1], topics))
+            if pending is not None:
+                slot = next(self._slots)
+                self._pending[slot] = pending
+                self._open[key] = slot
+
+        if self._flush_handle is None and self._pending:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.window, lambda: asyncio.create_task(self.flush()))
+
+    async def flush(self):
+        """Publish everything pending, in order"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, OrderedDict()
+        self._open.clear()
+        for data, topics in pending.values():
+            self.published += 1
+            await self.publish(data, topics)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+def merge_key(data: dict):
+    """Events with the same key can be merged with ``merge_events``; None if the event never merges"""
+    event_type = data.get("type")
+    if event_type in GOAL_EVENTS:
+        return ("goal", data["data"]["goal_id"])
+    if event_type in ("stats_updated", "goals_imported"):
+        return event_type
+    return None
+
+def touched_goals(data: dict) -> Set[int]:
+    """Ids of the goals an event is about"""
+    payload = data.get("data")
+    if not isinstance(payload, dict):
+        return set()
+    goal_ids = set(payload.get("goal_ids", []))
+    if "goal_id" in payload:
+        goal_ids.add(payload["goal_id"])
+    goal_ids.update(goal["goal_id"] for goal in payload.get("goals", []) if isinstance(goal, dict) and "goal_id" in goal)
+    return goal_ids
+
+def merge_events(old: dict, new: dict) -> Optional[dict]:
+    """One event equivalent to ``old`` then ``new``, or None if they cancel out"""
+    old_type, new_type = old["type"], new["type"]
+    if new_type == "stats_updated":
+        return new
+    if new_type == "goals_imported":
+        return {**new, "data": {**new["data"], "count": old["data"]["count"] + new["data"]["count"]}}
+    if new_type == "goal_deleted":
+        return None if old_type == "goal_created" else new
+    if old_type == "goal_created" and new_type in DELTA_EVENTS:
+        goal = {**old["data"]["goal"], **new["data"]["changes"]}
+        entries = new["data"].get("entries", [])
+        if entries:
+            goal["progress_entries"] = entries + goal.get("progress_entries", [])
+        return {**old, "data": {**old["data"], "goal": goal}}
+    if old_type in DELTA_EVENTS and new_type in DELTA_EVENTS:
+        # progress_updated carries entries and feedback, so it wins the type
+        event_type = "progress_updated" if "progress_updated" in (old_type, new_type) else "goal_updated"
+        data = {**old["data"], **new["data"], "changes": {**old["data"]["changes"], **new["data"]["changes"]}}
+        entries = new["data"].get("entries", []) + old["data"].get("entries", [])
+        if entries or event_type == "progress_updated":
+            data["entries"] = entries
+        return {**new, "type": event_type, "data": data}
+    # Anything else (e.g. a goal re-announced after deletion) keeps the latest event
+    return new
+
+def _union(first: List[str], second: List[str]) -> List[str]:
+    return first + [topic for topic in second if topic not in first]
@@ -0,0 +1,76 @@
+"""Encode broadcast events once and reuse the frames for every client.
+
+JSON frames use orjson when it is installed and fall back to the standard
+library. MessagePack binary frames are available to clients that ask for
+them when the optional ``msgpack`` package is installed.
+"""
+
+from datetime import date, datetime
+from typing import Dict, Tuple, Union
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional encoding
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+
+# WebSocket subprotocol names clients can offer to pick an encoding
+SUBPROTOCOLS = {
+    "goals.json": JSON,
+    "goals.msgpack": MSGPACK,
+}
+
+def available_encodings():
+    return (JSON, MSGPACK) if msgpack is not None else (JSON,)
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+def encode_json(event: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(event, default=_default).decode()
+    return json.dumps(event, default=_default, separators=(",", ":"))
+
+def encode_msgpack(event: dict) -> bytes:
+    return msgpack.packb(event, default=_default, use_bin_type=True)
+
+ENCODERS = {
+    JSON: encode_json,
+    MSGPACK: encode_msgpack,
+}
+
+class EncodedEvent:
+    """An event plus its wire frames, each encoded at most once.
+
+    ``topics`` are the subscription topics the event is published on.
+    """
+
+    __slots__ = ("event", "topics", "_frames")
+
+    def __init__(self, event: dict, topics: Tuple[str, ...] = ()):
+        self.event = event
+        self.topics = topics
+        self._frames: Dict[str, Union[str, bytes]] = {}
+
+    def frame(self, encoding: str = JSON) -> Union[str, bytes]:
+        """Text frame (str) for JSON, binary frame (bytes) for MessagePack"""
+        frame = self._frames.get(encoding)
+        if frame is None:
+            frame = self._frames[encoding] = ENCODERS[encoding](self.event)
+        return frame
+
+    def asgi_message(self, encoding: str = JSON) -> dict:
+        frame = self.frame(encoding)
+        if isinstance(frame, bytes):
+            return {"type": "websocket.send", "bytes": frame}
+        return {"type": "websocket.send", "text": frame}
@@ -1,23 +1,52 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import ValidationError
 import json
-from typing import List
-import asyncio
+from typing import List, Optional
+import os
+from contextlib import asynccontextmanager
 from datetime import datetime
 
-from . import models, schemas, crud
-from .database import SessionLocal, engine
+from . import schemas, crud, async_crud, migrations
+from .database import SessionLocal, AsyncSessionLocal, engine, async_engine, get_pool_metrics, init_lock
+from .bulk_io import iter_request_items, ndjson_line, NDJSON_MEDIA_TYPE
 from .nlp_processor import NLPProcessor
-from .websocket_manager import ConnectionManager
+from .nlp_executor import NLPExecutor, ExecutorSaturated
+from .websocket_manager import ConnectionManager, STATS_TOPIC, category_topic, goal_topics
+from .response_cache import DASHBOARD_TAG, ResponseCache, etag_matches, goal_tag
+from .event_encoding import encode_json
 
-# Create database tables
-print("🔧 Creating database tables...")
-models.Base.metadata.create_all(bind=engine)
-print("✅ Database tables created")
+# Apply pending migrations when the app starts; set to false when deploys
+# run `python -m app.migrations` as a separate step
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "true").lower() in ("1", "true", "yes")
 
-app = FastAPI(title="Goal Tracker API", version="1.0.0")
+def prepare_database():
+    """Bring the schema up to date and make sure the statistics counters exist"""
+    # Workers started together (uvicorn --workers) take turns setting up the schema
+    with init_lock():
+        if MIGRATE_ON_STARTUP:
+            print("🔧 Applying database migrations...")
+            applied = migrations.migrate(engine)
+            print(f"✅ Database schema up to date (applied: {applied or 'none'})")
+        
+        # Make sure the dashboard statistics counters exist for this database
+        with SessionLocal() as db:
+            crud.ensure_statistics(db)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    prepare_database()
+    await manager.start()
+    yield
+    await manager.stop()
+    nlp_executor.shutdown()
+    # Close pooled async connections so their driver threads exit cleanly
+    await async_engine.dispose()
+
+app = FastAPI(title="Goal Tracker API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware for frontend
 app.add_middleware(
@@ -28,40 +57,150 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Pagination settings for GET /goals
+GOALS_PAGE_SIZE = int(os.getenv("GOALS_PAGE_SIZE", "50"))
+GOALS_MAX_PAGE_SIZE = int(os.getenv("GOALS_MAX_PAGE_SIZE", "100"))
+
+# Default page size for GET /goals/search
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "20"))
+
+# Point limits for GET /goals/{id}/history
+HISTORY_POINTS = int(os.getenv("HISTORY_POINTS", "500"))
+HISTORY_MAX_POINTS = int(os.getenv("HISTORY_MAX_POINTS", "2000"))
+
+# Goal fields a progress update can change, sent in progress broadcasts
+PROGRESS_FIELDS = {"progress_percentage", "status", "updated_at"}
+
+# Bulk import/export settings
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+
 # WebSocket connection manager
 manager = ConnectionManager()
 nlp_processor = NLPProcessor()
+# NLP calls are awaited through a bounded pool so they never block the event loop
+nlp_executor = NLPExecutor(nlp_processor)
+# Encoded bodies of GET /goals/{id} and GET /dashboard, dropped by the writes that change them
+response_cache = ResponseCache()
 
-def get_db():
-    db = SessionLocal()
-    try:
+# Goal events that change what the cached responses show
+GOAL_CHANGE_EVENTS = {
+    "goal_created", "goal_updated", "progress_updated", "goal_deleted",
+    "goals_deleted", "goals_imported", "progress_batch_updated"
+}
+
+def invalidate_for_event(event: dict):
+    """Drop cached responses for a goal event, including ones broadcast by other workers"""
+    if event.get("type") == "resync_required":
+        # Events from another worker were lost, so any cached response may be stale
+        response_cache.clear()
+        return
+    if event.get("type") not in GOAL_CHANGE_EVENTS:
+        return
+    data = event.get("data", {})
+    goal_ids = list(data.get("goal_ids", []))
+    if "goal_id" in data:
+        goal_ids.append(data["goal_id"])
+    goal_ids.extend(goal["goal_id"] for goal in data.get("goals", []))
+    response_cache.invalidate_goals(*goal_ids)
+
+manager.add_listener(invalidate_for_event)
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+def entries_limit_param(
+    include: str = Query("entries", description="Comma-separated related data to embed; omit 'entries' to skip progress entries"),
+    entries_limit: Optional[int] = Query(None, ge=0, description="Embed only the latest N progress entries per goal")
+) -> Optional[int]:
+    """How many progress entries to embed per goal (None means all)"""
+    if "entries" not in include.split(","):
+        return 0
+    return entries_limit
+
+def summary_to_json(row) -> dict:
+    """JSON form of a crud.get_goal_summaries row, matching schemas.GoalSummary"""
+    return {
+        "id": row.id,
+        "title": row.title,
+        "category": row.category,
+        "status": row.status,
+        "progress_percentage": row.progress_percentage,
+        "updated_at": row.updated_at.isoformat() if row.updated_at else None
+    }
+
+async def cached_json_response(request: Request, key: tuple, build) -> Response:
+    """Serve ``key`` from the response cache (304 if the client's ETag matches), building it on a miss"""
+    cached = await response_cache.get_or_build(key, build)
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
+
+async def broadcast_statistics(db: AsyncSession):
+    """Publish fresh dashboard statistics on the "stats" topic, if anyone listens"""
+    if manager.has_subscribers(STATS_TOPIC):
+        await manager.broadcast({
+            "type": "stats_updated",
+            "data": {"statistics": await async_crud.get_goal_statistics(db)}
+        }, topics=[STATS_TOPIC])
+
+async def run_nlp(method: str, *args):
+    """Await an NLPProcessor method on the executor, answering 429 when it is saturated"""
+    try:
+        return await nlp_executor.run(method, *args)
+    except ExecutorSaturated:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many progress updates are being analyzed; try again shortly",
+            headers={"Retry-After": "1"}
+        )
+
+async def aenumerate(iterable, start: int = 0):
+    """enumerate() for async iterators"""
+    index = start
+    async for item in iterable:
+        yield index, item
+        index += 1
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics for capacity tuning"""
+    return {
+        "database_pool": get_pool_metrics(),
+        "websocket": manager.stats(),
+        "nlp": nlp_executor.stats(),
+        "response_cache": response_cache.stats()
+    }
+
 @app.get("/")
 async def root():
     return {"message": "Goal Tracker API is running"}
 
 @app.post("/goals", response_model=schemas.Goal)
-async def create_goal(goal: schemas.GoalCreate, db: Session = Depends(get_db)):
+async def create_goal(goal: schemas.GoalCreate, db: AsyncSession = Depends(get_db)):
     """Create a new goal"""
     try:
         print(f"Received goal data: {goal}")  # Debug log
-        db_goal = crud.create_goal(db=db, goal=goal)
+        db_goal = await async_crud.create_goal(db=db, goal=goal)
         print(f"Created goal in database: {db_goal.id}")  # Debug log
+        response_cache.invalidate(DASHBOARD_TAG)
         
-        # Broadcast to all connected clients
-        goal_data = schemas.Goal.model_validate(db_goal).model_dump(mode='json')
+        # Broadcast to clients following this goal or its category
         await manager.broadcast({
             "type": "goal_created",
-            "data": goal_data
-        })
+            "data": {
+                "goal_id": db_goal.id,
+                "goal": db_goal.model_dump(exclude={"progress_entries"})
+            }
+        }, topics=goal_topics(db_goal.id, db_goal.category))
+        await broadcast_statistics(db)
         
         return db_goal
     except Exception as e:
@@ -70,47 +209,201 @@ async def create_goal(goal: schemas.GoalCreate, db: Session = Depends(get_db)):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to create goal: {str(e)}")
 
-@app.get("/goals", response_model=List[schemas.Goal])
-async def list_goals(db: Session = Depends(get_db)):
-    """List all goals"""
-    return crud.get_goals(db)
+@app.post("/goals/bulk")
+async def bulk_create_goals(request: Request, db: AsyncSession = Depends(get_db)):
+    """Import many goals from an NDJSON body or a JSON array in one transaction"""
+    created = 0
+    categories = set()
+    chunk: List[schemas.GoalCreate] = []
+    index = 0
+    try:
+        async for index, item in aenumerate(iter_request_items(request)):
+            goal = schemas.GoalCreate.model_validate(item)
+            categories.add(goal.category)
+            chunk.append(goal)
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                created += await async_crud.insert_goals(db, chunk)
+                chunk = []
+        created += await async_crud.insert_goals(db, chunk)
+        await db.commit()
+    except ValidationError as e:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail={"index": index, "errors": e.errors(include_url=False)})
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid import body: {str(e)}")
+    response_cache.invalidate(DASHBOARD_TAG)
+    
+    # One aggregate broadcast for the whole import
+    await manager.broadcast({
+        "type": "goals_imported",
+        "data": {"count": created}
+    }, topics=sorted({category_topic(category) for category in categories}))
+    await broadcast_statistics(db)
+    
+    return {"message": "Goals imported successfully", "created": created}
+
+@app.get("/goals/export")
+async def export_goals():
+    """Stream every goal as NDJSON"""
+    async def generate():
+        # The stream outlives the request's dependencies, so it owns its session
+        async with AsyncSessionLocal() as db:
+            async for goal in async_crud.stream_goals(db, chunk_size=BULK_CHUNK_SIZE):
+                yield ndjson_line(goal)
+    
+    return StreamingResponse(
+        generate(),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": "attachment; filename=goals.ndjson"}
+    )
+
+@app.get("/goals/search", response_model=schemas.GoalSearchPage)
+async def search_goals(
+    q: Optional[str] = Query(None, description="Words to find in goal titles, descriptions and progress updates"),
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    min_progress: Optional[float] = Query(None, ge=0, le=100),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search goals by text and filters, best match first; pass next_offset back for more"""
+    limit = min(limit, GOALS_MAX_PAGE_SIZE)
+    try:
+        # One extra row tells whether there is another page
+        rows = await async_crud.search_goals(
+            db,
+            q=q or None,
+            status=status,
+            category=category,
+            min_progress=min_progress,
+            limit=limit + 1,
+            offset=offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "items": [dict(summary_to_json(row), rank=row.rank, entry_matches=row.entry_matches) for row in rows[:limit]],
+        "next_offset": offset + limit if len(rows) > limit else None
+    }
+
+@app.get("/goals", response_model=schemas.GoalPage)
+async def list_goals(
+    cursor: Optional[str] = None,
+    page_size: int = Query(GOALS_PAGE_SIZE, ge=1),
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    entries_limit: Optional[int] = Depends(entries_limit_param),
+    db: AsyncSession = Depends(get_db)
+):
+    """List goals one page at a time; pass next_cursor back to get the next page"""
+    try:
+        goals, next_cursor = await async_crud.get_goals_page(
+            db,
+            page_size=min(page_size, GOALS_MAX_PAGE_SIZE),
+            cursor=cursor,
+            status=status,
+            category=category,
+            entries_limit=entries_limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": goals, "next_cursor": next_cursor}
 
 @app.get("/goals/{goal_id}", response_model=schemas.Goal)
-async def get_goal(goal_id: int, db: Session = Depends(get_db)):
-    """Get a specific goal"""
-    db_goal = crud.get_goal(db, goal_id=goal_id)
-    if db_goal is None:
-        raise HTTPException(status_code=404, detail="Goal not found")
-    return db_goal
+async def get_goal(
+    goal_id: int,
+    request: Request,
+    entries_limit: Optional[int] = Depends(entries_limit_param),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a specific goal (cached; supports If-None-Match)"""
+    async def build() -> bytes:
+        db_goal = await async_crud.get_goal(db, goal_id=goal_id, entries_limit=entries_limit)
+        if db_goal is None:
+            raise HTTPException(status_code=404, detail="Goal not found")
+        return db_goal.model_dump_json().encode()
+    
+    return await cached_json_response(request, (goal_tag(goal_id), entries_limit), build)
+
+@app.get("/goals/{goal_id}/history", response_model=schemas.GoalHistory)
+async def get_goal_history(
+    goal_id: int,
+    request: Request,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: Optional[str] = Query(None, description="Aggregate per day, week or month"),
+    max_points: int = Query(HISTORY_POINTS, ge=3, description="Downsample (LTTB) to at most this many points"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Progress over time for charts, aggregated and downsampled server-side (cached; supports If-None-Match)"""
+    max_points = min(max_points, HISTORY_MAX_POINTS)
+    
+    async def build() -> bytes:
+        try:
+            history = await async_crud.get_progress_history(
+                db, goal_id, max_points=max_points, bucket=bucket, start=start, end=end
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if history is None:
+            raise HTTPException(status_code=404, detail="Goal not found")
+        return history.model_dump_json().encode()
+    
+    key = (goal_tag(goal_id), "history", bucket, start, end, max_points)
+    return await cached_json_response(request, key, build)
+
+@app.delete("/goals")
+async def delete_goals(
+    ids: Optional[str] = Query(None, description="Comma separated goal ids"),
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete every goal matching all the given filters, with their progress entries"""
+    goal_ids = None
+    if ids is not None:
+        try:
+            goal_ids = sorted({int(goal_id) for goal_id in ids.split(",") if goal_id.strip()})
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be comma separated integers")
+    if goal_ids is None and status is None and category is None:
+        raise HTTPException(status_code=400, detail="Pass ids, status or category to choose the goals to delete")
+    
+    deleted = await async_crud.delete_goals(db, ids=goal_ids, status=status, category=category)
+    deleted_ids = [row.id for row in deleted]
+    response_cache.invalidate_goals(*deleted_ids)
+    
+    # One broadcast for the whole batch
+    if deleted:
+        topics = {topic for row in deleted for topic in goal_topics(row.id, row.category)}
+        await manager.broadcast({
+            "type": "goals_deleted",
+            "data": {"goal_ids": deleted_ids}
+        }, topics=sorted(topics))
+        await broadcast_statistics(db)
+    
+    return {"message": "Goals deleted successfully", "deleted": len(deleted_ids), "goal_ids": deleted_ids}
 
 @app.delete("/goals/{goal_id}")
-async def delete_goal(goal_id: int, db: Session = Depends(get_db)):
+async def delete_goal(goal_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a goal and all its progress entries"""
     try:
-        # Check if goal exists
-        db_goal = crud.get_goal(db, goal_id=goal_id)
-        if db_goal is None:
+        # One DELETE ... RETURNING; the category routes the broadcast
+        deleted = await async_crud.delete_goals(db, ids=[goal_id])
+        if not deleted:
             raise HTTPException(status_code=404, detail="Goal not found")
+        response_cache.invalidate_goals(goal_id)
         
-        # Store goal data for broadcast before deletion
-        goal_data = schemas.Goal.model_validate(db_goal).model_dump(mode='json')
-        
-        # Delete the goal
-        success = crud.delete_goal(db=db, goal_id=goal_id)
+        # Broadcast deletion to clients following this goal or its category
+        await manager.broadcast({
+            "type": "goal_deleted",
+            "data": {"goal_id": goal_id}
+        }, topics=goal_topics(goal_id, deleted[0].category))
+        await broadcast_statistics(db)
         
-        if success:
-            # Broadcast deletion to all connected clients
-            await manager.broadcast({
-                "type": "goal_deleted",
-                "data": {
-                    "goal_id": goal_id,
-                    "deleted_goal": goal_data
-                }
-            })
-            
-            return {"message": "Goal deleted successfully", "goal_id": goal_id}
-        else:
-            raise HTTPException(status_code=500, detail="Failed to delete goal")
+        return {"message": "Goal deleted successfully", "goal_id": goal_id}
             
     except HTTPException:
         raise
@@ -121,20 +414,29 @@ async def delete_goal(goal_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to delete goal: {str(e)}")
 
 @app.put("/goals/{goal_id}", response_model=schemas.Goal)
-async def update_goal(goal_id: int, goal_update: schemas.GoalUpdate, db: Session = Depends(get_db)):
+async def update_goal(goal_id: int, goal_update: schemas.GoalUpdate, db: AsyncSession = Depends(get_db)):
     """Update goal details"""
     try:
-        db_goal = crud.get_goal(db, goal_id=goal_id)
-        if db_goal is None:
-            raise HTTPException(status_code=404, detail="Goal not found")
+        changed_fields = set(goal_update.model_dump(exclude_unset=True)) | {"updated_at"}
+        # A goal moving category is announced to followers of the old category too
+        old_categories = {}
+        if "category" in changed_fields:
+            old_categories = await async_crud.get_goal_categories(db, [goal_id])
         
-        updated_goal = crud.update_goal(db=db, goal_id=goal_id, goal_update=goal_update)
+        updated_goal = await async_crud.update_goal(db=db, goal_id=goal_id, goal_update=goal_update)
+        if updated_goal is None:
+            raise HTTPException(status_code=404, detail="Goal not found")
+        response_cache.invalidate_goals(goal_id)
         
-        # Broadcast update to all connected clients
+        # Broadcast only the fields this request changed
         await manager.broadcast({
             "type": "goal_updated",
-            "data": schemas.Goal.model_validate(updated_goal).model_dump(mode='json')
-        })
+            "data": {
+                "goal_id": goal_id,
+                "changes": updated_goal.model_dump(include=changed_fields)
+            }
+        }, topics=goal_topics(goal_id, updated_goal.category, *old_categories.values()))
+        await broadcast_statistics(db)
         
         return updated_goal
         
@@ -150,18 +452,18 @@ async def update_goal(goal_id: int, goal_update: schemas.GoalUpdate, db: Session
 async def update_goal_progress(
     goal_id: int, 
     update: schemas.ProgressUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add a progress update using natural language"""
-    # Get the goal
-    db_goal = crud.get_goal(db, goal_id=goal_id)
-    if db_goal is None:
+    # Only the title is needed up front; record_progress returns the updated fields
+    titles = await async_crud.get_goal_titles(db, [goal_id])
+    if goal_id not in titles:
         raise HTTPException(status_code=404, detail="Goal not found")
     
     # Process the natural language update
-    analysis = nlp_processor.analyze_progress_update(update.text, db_goal.title)
+    analysis = await run_nlp("analyze_progress_update", update.text, titles[goal_id])
     
-    # Create progress entry
+    # Store the entry and the new goal progress in one transaction
     progress_data = schemas.ProgressEntryCreate(
         goal_id=goal_id,
         text=update.text,
@@ -170,24 +472,26 @@ async def update_goal_progress(
         key_insights=analysis.get("insights", [])
     )
     
-    db_progress = crud.create_progress_entry(db=db, progress=progress_data)
-    
-    # Update goal progress
-    crud.update_goal_progress(db=db, goal_id=goal_id, progress=analysis.get("progress_percentage", 0))
+    try:
+        db_progress, updated_goal = await async_crud.record_progress(db=db, progress=progress_data)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    response_cache.invalidate_goals(goal_id)
     
     # Generate AI feedback
-    feedback = nlp_processor.generate_feedback(db_goal, analysis)
+    feedback = await run_nlp("generate_feedback", updated_goal, analysis)
     
     # Broadcast update
     await manager.broadcast({
         "type": "progress_updated",
         "data": {
             "goal_id": goal_id,
-            "progress": schemas.ProgressEntry.model_validate(db_progress).model_dump(mode='json'),
-            "feedback": feedback,
-            "updated_goal": schemas.Goal.model_validate(crud.get_goal(db, goal_id)).model_dump(mode='json')
+            "changes": updated_goal.model_dump(include=PROGRESS_FIELDS),
+            "entries": [db_progress.model_dump()],
+            "feedback": feedback
         }
-    })
+    }, topics=goal_topics(goal_id, updated_goal.category))
+    await broadcast_statistics(db)
     
     return {
         "progress": db_progress,
@@ -195,29 +499,158 @@ async def update_goal_progress(
         "analysis": analysis
     }
 
-@app.get("/dashboard")
-async def get_dashboard_data(db: Session = Depends(get_db)):
-    """Get public dashboard data"""
-    goals = crud.get_goals(db)
-    stats = crud.get_goal_statistics(db)
+@app.post("/progress/batch")
+async def record_progress_batch(batch: schemas.ProgressBatch, db: AsyncSession = Depends(get_db)):
+    """Add many natural language progress updates in one transaction"""
+    if not batch.updates:
+        return {"processed": 0, "results": []}
+    
+    goal_ids = sorted({item.goal_id for item in batch.updates})
+    titles = await async_crud.get_goal_titles(db, goal_ids)
+    missing = [goal_id for goal_id in goal_ids if goal_id not in titles]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Goals not found: {missing}")
+    
+    # Process the natural language updates
+    analyses = await run_nlp(
+        "analyze_batch",
+        [item.text for item in batch.updates],
+        [titles[item.goal_id] for item in batch.updates]
+    )
+    progress_data = [
+        schemas.ProgressEntryCreate(
+            goal_id=item.goal_id,
+            text=item.text,
+            progress_percentage=analysis.get("progress_percentage", 0),
+            sentiment=analysis.get("sentiment", "neutral"),
+            key_insights=analysis.get("insights", []),
+            created_at=item.timestamp
+        )
+        for item, analysis in zip(batch.updates, analyses)
+    ]
+    
+    try:
+        db_entries = await async_crud.record_progress_batch(db, progress_data)
+    except LookupError as e:
+        # A goal was deleted after the lookup above
+        raise HTTPException(status_code=404, detail=str(e))
+    response_cache.invalidate_goals(*goal_ids)
     
+    # One broadcast carrying the new entries and final progress of every touched goal
+    updated_goals = await async_crud.get_goals_by_ids(db, goal_ids, entries_limit=0)
+    entries_by_goal = {goal_id: [] for goal_id in goal_ids}
+    for db_entry in db_entries:
+        entries_by_goal[db_entry.goal_id].append(db_entry.model_dump())
+    await manager.broadcast({
+        "type": "progress_batch_updated",
+        "data": {
+            "goals": [
+                {
+                    "goal_id": goal.id,
+                    "changes": goal.model_dump(include=PROGRESS_FIELDS),
+                    "entries": entries_by_goal[goal.id]
+                }
+                for goal in updated_goals
+            ]
+        }
+    }, topics=sorted({topic for goal in updated_goals for topic in goal_topics(goal.id, goal.category)}))
+    await broadcast_statistics(db)
+    
+    goals_by_id = {goal.id: goal for goal in updated_goals}
+    feedbacks = await run_nlp(
+        "generate_feedback_batch",
+        [goals_by_id[db_entry.goal_id] for db_entry in db_entries],
+        analyses
+    )
     return {
-        "goals": [schemas.Goal.model_validate(goal).model_dump(mode='json') for goal in goals],
-        "statistics": stats,
-        "last_updated": "now"
+        "processed": len(db_entries),
+        "results": [
+            {
+                "progress": db_entry,
+                "feedback": feedback,
+                "analysis": analysis
+            }
+            for db_entry, analysis, feedback in zip(db_entries, analyses, feedbacks)
+        ]
     }
 
+@app.get("/dashboard")
+async def get_dashboard_data(
+    request: Request,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    entries_limit: Optional[int] = Depends(entries_limit_param),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get public dashboard data (cached; supports If-None-Match)
+
+    ``view=summary`` returns GoalSummary cards (no description or progress
+    entries) read straight from the columns, which is much cheaper to build.
+    """
+    async def build() -> bytes:
+        # Read before the snapshot so no event between the two is missed on replay
+        seq, epoch = manager.snapshot_position()
+        if view == "summary":
+            goals = [summary_to_json(row) for row in await async_crud.get_goal_summaries(db)]
+        else:
+            goals = [
+                goal.model_dump(mode='json')
+                for goal in await async_crud.get_goals(db, entries_limit=entries_limit)
+            ]
+        stats = await async_crud.get_goal_statistics(db)
+        
+        return encode_json({
+            "goals": goals,
+            "statistics": stats,
+            # Replay WebSocket events after this to catch up from this snapshot
+            # (null with several workers, whose numbering the socket may not share)
+            "seq": seq,
+            "epoch": epoch,
+            "last_updated": "now"
+        }).encode()
+    
+    return await cached_json_response(request, (DASHBOARD_TAG, view, entries_limit), build)
+
+@app.post("/admin/statistics/rebuild", response_model=schemas.DashboardStats)
+async def rebuild_statistics(db: AsyncSession = Depends(get_db)):
+    """Recompute the dashboard statistics counters from scratch"""
+    stats = await async_crud.rebuild_statistics(db)
+    response_cache.invalidate(DASHBOARD_TAG)
+    await broadcast_statistics(db)
+    return stats
+
+@app.get("/events")
+async def get_events(since: int = Query(0, ge=0), topics: Optional[str] = None, epoch: Optional[str] = None):
+    """Broadcast events after sequence number ``since``, for catching up after a reconnect.
+
+    ``topics`` (comma separated) limits the result to events on those topics.
+    Pass the ``epoch`` that came with ``since`` so a restarted server's
+    numbering is not mistaken for the old one.
+    """
+    events = manager.events_since(since, topics.split(",") if topics else None, epoch)
+    if events is None:
+        raise HTTPException(status_code=410, detail="Events since this sequence number are no longer available; reload /dashboard")
+    return {"events": events, "last_seq": manager.last_seq, "epoch": manager.epoch}
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    if not await manager.connect(websocket):
+        return
     try:
         while True:
             data = await websocket.receive_text()
-            # Handle any client messages if needed
-            await asyncio.sleep(0.1)
+            await manager.handle_client_message(websocket, data)
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Also covers errors other than a clean disconnect, so no client is leaked
         manager.disconnect(websocket)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        # permessage-deflate compresses JSON frames for clients that negotiate it
+        ws_per_message_deflate=os.getenv("WS_PER_MESSAGE_DEFLATE", "true").lower() in ("1", "true", "yes")
+    )
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""Versioned schema migrations.
+
+Each migration is a function that takes a connection inside a transaction
+and changes the schema by one step. Applied versions are recorded in the
+``schema_migrations`` table, so ``migrate`` only runs what a database is
+missing. Databases created by the old ``create_all`` at startup are picked
+up by migration 1, which only creates tables that do not exist yet.
+
+To change the schema, update the models and append a migration that brings
+an existing database to the same shape. Never edit a migration that has
+already shipped.
+
+    python -m app.migrations            # apply pending migrations
+    python -m app.migrations --list     # show applied and pending versions
+    python -m app.migrations --target 1 # apply up to a version
+"""
+
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional
+import argparse
+
+from sqlalchemy import (
+    JSON, Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text, inspect, select, text
+)
+from sqlalchemy.engine import Connection, Engine
+
+from . import search_index
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+_meta = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations", _meta,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+def _initial_schema(connection: Connection):
+    """The tables create_all built at startup before migrations existed.
+
+    That is the schema as the app first shipped it plus the ``goal_stats``
+    counters table added with the dashboard statistics, which create_all
+    was already creating by then.
+    """
+    # Frozen copy of those tables, independent of later model changes
+    meta = MetaData()
+    Table(
+        "goals", meta,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("title", String, index=True, nullable=False),
+        Column("description", Text),
+        Column("category", String, index=True),
+        Column("target_date", DateTime),
+        Column("created_at", DateTime),
+        Column("updated_at", DateTime),
+        Column("progress_percentage", Float),
+        Column("status", String),
+    )
+    Table(
+        "progress_entries", meta,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("goal_id", Integer, ForeignKey("goals.id")),
+        Column("text", Text, nullable=False),
+        Column("progress_percentage", Float),
+        Column("sentiment", String),
+        Column("key_insights", JSON),
+        Column("created_at", DateTime),
+    )
+    Table(
+        "goal_stats", meta,
+        Column("key", String, primary_key=True),
+        Column("value", Float, nullable=False),
+    )
+    meta.create_all(connection, checkfirst=True)
+
+def _query_indexes(connection: Connection):
+    """Indexes for how the tables are actually queried.
+
+    - progress_entries (goal_id, created_at): a goal's entries newest first,
+      deleting a goal's entries, and the latest-N-entries window query
+    - goals (status) and (status, category): status filters and statistics
+    - goals (created_at, id): keyset pagination of GET /goals
+    """
+    # Frozen copies of the indexed columns, independent of later model changes
+    meta = MetaData()
+    goals = Table(
+        "goals", meta,
+        Column("id", Integer, primary_key=True),
+        Column("category", String),
+        Column("created_at", DateTime),
+        Column("status", String),
+    )
+    progress_entries = Table(
+        "progress_entries", meta,
+        Column("id", Integer, primary_key=True),
+        Column("goal_id", Integer),
+        Column("created_at", DateTime),
+    )
+    indexes = [
+        Index("ix_progress_entries_goal_id_created_at", progress_entries.c.goal_id, progress_entries.c.created_at),
+        Index("ix_goals_status", goals.c.status),
+        Index("ix_goals_status_category", goals.c.status, goals.c.category),
+        Index("ix_goals_created_at_id", goals.c.created_at, goals.c.id),
+    ]
+    for index in indexes:
+        index.create(connection, checkfirst=True)
+
+def _cascade_progress_entries(connection: Connection):
+    """Make progress_entries.goal_id ON DELETE CASCADE so deleting a goal is one statement"""
+    if connection.dialect.name != "sqlite":
+        for foreign_key in inspect(connection).get_foreign_keys("progress_entries"):
+            if foreign_key["referred_table"] == "goals":
+                connection.execute(text(f'ALTER TABLE progress_entries DROP CONSTRAINT "{foreign_key["name"]}"'))
+        connection.execute(text(
+            "ALTER TABLE progress_entries ADD CONSTRAINT progress_entries_goal_id_fkey "
+            "FOREIGN KEY (goal_id) REFERENCES goals (id) ON DELETE CASCADE"
+        ))
+        return
+    
+    # SQLite cannot alter a constraint, so rebuild the table with it
+    meta = MetaData()
+    Table(
+        "goals", meta,
+        Column("id", Integer, primary_key=True),
+    )
+    rebuilt = Table(
+        "progress_entries_rebuild", meta,
+        Column("id", Integer, primary_key=True),
+        Column("goal_id", Integer, ForeignKey("goals.id", ondelete="CASCADE")),
+        Column("text", Text, nullable=False),
+        Column("progress_percentage", Float),
+        Column("sentiment", String),
+        Column("key_insights", JSON),
+        Column("created_at", DateTime),
+    )
+    rebuilt.create(connection)
+    columns = "id, goal_id, text, progress_percentage, sentiment, key_insights, created_at"
+    # Entries left behind by goals deleted without them would violate the constraint
+    orphans = connection.execute(text(
+        "SELECT COUNT(*) FROM progress_entries WHERE goal_id IS NOT NULL AND goal_id NOT IN (SELECT id FROM goals)"
+    )).scalar()
+    if orphans:
+        print(f"⚠️  Dropping {orphans} progress entries whose goal no longer exists")
+    connection.execute(text(
+        f"INSERT INTO progress_entries_rebuild ({columns}) SELECT {columns} FROM progress_entries "
+        "WHERE goal_id IS NULL OR goal_id IN (SELECT id FROM goals)"
+    ))
+    connection.execute(text("DROP TABLE progress_entries"))
+    connection.execute(text("ALTER TABLE progress_entries_rebuild RENAME TO progress_entries"))
+    # The table's indexes were dropped with it: the ones migrations 1 and 2 created
+    progress_entries = Table(
+        "progress_entries", MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("goal_id", Integer),
+        Column("created_at", DateTime),
+    )
+    for index in (
+        Index("ix_progress_entries_id", progress_entries.c.id),
+        Index("ix_progress_entries_goal_id_created_at", progress_entries.c.goal_id, progress_entries.c.created_at),
+    ):
+        index.create(connection, checkfirst=True)
+
+def _search_index(connection: Connection):
+    """Full-text search over goals and progress text (FTS5 tables on SQLite, GIN indexes on PostgreSQL)"""
+    search_index.create(connection)
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial schema", _initial_schema),
+    Migration(2, "query indexes", _query_indexes),
+    Migration(3, "cascade progress entry deletes", _cascade_progress_entries),
+    Migration(4, "full-text search index", _search_index),
+]
+
+def applied_versions(connection: Connection) -> List[int]:
+    if not inspect(connection).has_table(schema_migrations.name):
+        return []
+    return list(connection.execute(select(schema_migrations.c.version).order_by(schema_migrations.c.version)).scalars())
+
+def migrate(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to ``target`` (default: all) and return their versions.
+
+    Each migration runs in its own transaction together with its
+    schema_migrations row.
+    """
+    with engine.begin() as connection:
+        schema_migrations.create(connection, checkfirst=True)
+        done = set(applied_versions(connection))
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version in done or (target is not None and migration.version > target):
+            continue
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow()
+            ))
+        applied.append(migration.version)
+    return applied
+
+def main(argv=None):
+    from .database import engine, init_lock
+
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--list", action="store_true", help="show applied and pending migrations")
+    parser.add_argument("--target", type=int, default=None, help="apply migrations up to this version")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        with engine.connect() as connection:
+            done = set(applied_versions(connection))
+        for migration in MIGRATIONS:
+            state = "applied" if migration.version in done else "pending"
+            print(f"{migration.version:>4}  {state:<8} {migration.name}")
+        return
+
+    with init_lock():
+        applied = migrate(engine, target=args.target)
+    print(f"✅ Applied migrations: {applied}" if applied else "✅ Database schema is up to date")
+
+if __name__ == "__main__":
+    main()
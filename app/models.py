@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -17,13 +17,27 @@ class Goal(Base):
     status = Column(String, default="active")  # active, completed, paused, cancelled
     
     # Relationships
-    progress_entries = relationship("ProgressEntry", back_populates="goal", order_by="ProgressEntry.created_at.desc()")
+    # passive_deletes: the database's ON DELETE CASCADE removes entries, the ORM never loads them for it
+    progress_entries = relationship(
+        "ProgressEntry",
+        back_populates="goal",
+        order_by="ProgressEntry.created_at.desc()",
+        passive_deletes=True
+    )
+    
+    # Added by migration 2 (see app/migrations.py)
+    __table_args__ = (
+        Index("ix_goals_status", "status"),
+        Index("ix_goals_status_category", "status", "category"),
+        # Keyset pagination order for GET /goals
+        Index("ix_goals_created_at_id", "created_at", "id"),
+    )
 
 class ProgressEntry(Base):
     __tablename__ = "progress_entries"
     
     id = Column(Integer, primary_key=True, index=True)
-    goal_id = Column(Integer, ForeignKey("goals.id"))
+    goal_id = Column(Integer, ForeignKey("goals.id", ondelete="CASCADE"))
     text = Column(Text, nullable=False)
     progress_percentage = Column(Float)
     sentiment = Column(String)  # positive, negative, neutral
@@ -31,4 +45,21 @@ class ProgressEntry(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    goal = relationship("Goal", back_populates="progress_entries")
\ No newline at end of file
+    goal = relationship("Goal", back_populates="progress_entries")
+    
+    # Added by migration 2: entries of one goal, newest first
+    __table_args__ = (
+        Index("ix_progress_entries_goal_id_created_at", "goal_id", "created_at"),
+    )
+
+class GoalStat(Base):
+    """Running aggregate counters for the dashboard statistics.
+
+    Each row is a single named counter (``total``, ``progress_sum``,
+    ``status:<name>``, ``category:<name>``) kept in step with the goals
+    table by the crud write functions.
+    """
+    __tablename__ = "goal_stats"
+    
+    key = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0.0)
\ No newline at end of file
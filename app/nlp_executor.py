@@ -0,0 +1,130 @@
+"""Run NLPProcessor calls off the event loop.
+
+Analysis is CPU-bound (and will get heavier with spaCy or transformer
+models), so handlers await it through an ``NLPExecutor`` instead of calling
+the processor directly. Calls run in a thread pool, or in a process pool
+where every worker holds its own copy of the processor. At most
+``max_pending`` calls may be queued or running; beyond that ``run`` raises
+``ExecutorSaturated`` straight away so the API can answer 429 instead of
+piling up work.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import os
+import time
+
+from .nlp_processor import NLPProcessor
+
+NLP_EXECUTOR = os.getenv("NLP_EXECUTOR", "thread")
+NLP_WORKERS = int(os.getenv("NLP_WORKERS", "4"))
+NLP_MAX_PENDING = int(os.getenv("NLP_MAX_PENDING", "64"))
+
+EXECUTOR_KINDS = ("thread", "process")
+
+class ExecutorSaturated(RuntimeError):
+    """Too many NLP calls are already queued or running"""
+
+# The processor of a process pool worker, set by _init_worker
+_worker_processor: Optional[NLPProcessor] = None
+
+def _init_worker(processor: NLPProcessor):
+    global _worker_processor
+    _worker_processor = processor
+
+def _timed_call(processor: Optional[NLPProcessor], method: str, args: tuple) -> Tuple[Any, float]:
+    """Call ``processor.method(*args)`` and return the result with its run time"""
+    started = time.perf_counter()
+    result = getattr(processor or _worker_processor, method)(*args)
+    return result, time.perf_counter() - started
+
+class CallTimings:
+    """Counts and durations for one NLPProcessor method"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.run_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def record(self, run: float, wait: float):
+        self.calls += 1
+        self.run_seconds += run
+        self.wait_seconds += wait
+        self.max_run_seconds = max(self.max_run_seconds, run)
+
+    def snapshot(self) -> dict:
+        calls = self.calls or 1
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_run_ms": round(self.run_seconds / calls * 1000, 3),
+            "max_run_ms": round(self.max_run_seconds * 1000, 3),
+            # Time spent waiting for a free worker
+            "avg_wait_ms": round(self.wait_seconds / calls * 1000, 3),
+        }
+
+class NLPExecutor:
+    def __init__(
+        self,
+        processor: NLPProcessor,
+        kind: str = NLP_EXECUTOR,
+        workers: int = NLP_WORKERS,
+        max_pending: int = NLP_MAX_PENDING
+    ):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown NLP executor: {kind}")
+        self.processor = processor
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rejected = 0
+        self._pending = 0
+        self._timings: Dict[str, CallTimings] = {}
+        if kind == "process":
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(processor,))
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nlp")
+
+    async def run(self, method: str, *args) -> Any:
+        """Await ``processor.<method>(*args)`` on the pool.
+
+        Raises ExecutorSaturated when ``max_pending`` calls are in flight.
+        """
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise ExecutorSaturated(f"{self._pending} NLP calls already pending")
+
+        timings = self._timings.setdefault(method, CallTimings())
+        # Process workers use their own copy of the processor
+        processor = self.processor if self.kind == "thread" else None
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            result, run = await asyncio.get_running_loop().run_in_executor(
+                self._pool, _timed_call, processor, method, args
+            )
+        except Exception:
+            timings.errors += 1
+            raise
+        finally:
+            self._pending -= 1
+        timings.record(run, time.perf_counter() - started - run)
+        return result
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "rejected": self.rejected,
+            "calls": {method: timings.snapshot() for method, timings in self._timings.items()},
+            # Process workers keep their own caches, which are not visible here
+            "cache": self.processor.cache.stats() if self.kind == "thread" else None,
+        }
@@ -1,8 +1,30 @@
 import re
-from typing import Dict, List, Any
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Any, NamedTuple, Optional, Sequence, Set, Tuple
 from datetime import datetime
+import os
 import random
 
+from .cache import TTLCache
+
+# Cache of the deterministic analysis of recently seen texts (0 disables it)
+NLP_CACHE_SIZE = int(os.getenv("NLP_CACHE_SIZE", "10000"))
+NLP_CACHE_TTL = float(os.getenv("NLP_CACHE_TTL", "3600"))
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+PERCENTAGE_PATTERN = re.compile(r'(\d+)%')
+FRACTION_PATTERN = re.compile(r'(\d+)/(\d+)')
+
+# Keyword hits from one scan: (table, label) -> distinct keywords found
+KeywordHits = Dict[Tuple[str, str], Set[str]]
+
+class TextFeatures(NamedTuple):
+    """Everything about an update that depends only on its text and goal"""
+    explicit_percentage: Optional[float]
+    progress_level: Optional[str]
+    sentiment: str
+    insights: Tuple[str, ...]
+
 class NLPProcessor:
     def __init__(self):
         # For now, we'll use simple rule-based processing
@@ -18,58 +40,214 @@ class NLPProcessor:
             "negative": ["bad", "terrible", "awful", "frustrated", "disappointed", "difficult"],
             "neutral": ["okay", "fine", "normal", "regular", "standard"]
         }
-
-    def analyze_progress_update(self, text: str, goal_title: str) -> Dict[str, Any]:
-        """Analyze a natural language progress update"""
-        text_lower = text.lower()
         
-        # Extract progress percentage
-        progress_percentage = self._extract_progress_percentage(text_lower)
+        # Insight -> keywords that suggest it, in the order insights are reported
+        self.insight_keywords = {
+            "Facing challenges that may need attention": ["challenge", "difficult", "problem"],
+            "Reached an important milestone": ["milestone", "achievement", "completed"],
+            "Developing new strategies or approaches": ["plan", "strategy", "approach"],
+            "Time management considerations mentioned": ["time", "schedule", "deadline"]
+        }
         
-        # Determine sentiment
-        sentiment = self._analyze_sentiment(text_lower)
+        # (normalized text, goal title) -> TextFeatures; cleared when the tables change
+        self.cache = TTLCache(NLP_CACHE_SIZE, NLP_CACHE_TTL)
+        self.compile_keywords()
+
+    def compile_keywords(self):
+        """Build one regex matching every keyword of every table.
+
+        Keywords match at the start of a word, so "plan" finds "planning" but
+        "time" no longer finds "sometimes". Call again after changing a table;
+        this also empties the analysis cache.
+        """
+        self.cache.clear()
+        tables = {
+            "progress": self.progress_keywords,
+            "sentiment": self.sentiment_keywords,
+            "insight": self.insight_keywords,
+        }
+        self._keyword_tags: Dict[str, List[Tuple[str, str]]] = {}
+        for table, labels in tables.items():
+            for label, keywords in labels.items():
+                for keyword in keywords:
+                    self._keyword_tags.setdefault(keyword.lower(), []).append((table, label))
         
-        # Extract key insights
-        insights = self._extract_insights(text, goal_title)
+        # Longest first so a keyword never shadows a longer one it is a prefix of
+        alternation = "|".join(re.escape(keyword) for keyword in sorted(self._keyword_tags, key=len, reverse=True))
+        self._keyword_pattern = re.compile(rf"\b({alternation})", re.IGNORECASE)
+        # For normalized texts, which are already lowercase: IGNORECASE makes the scan about three times slower
+        self._batch_keyword_pattern = re.compile(rf"\n|\b({alternation})")
+
+    def _scan_keywords(self, text: str) -> KeywordHits:
+        """Find every keyword in ``text`` in a single pass"""
+        hits: KeywordHits = {}
+        for match in self._keyword_pattern.finditer(text):
+            keyword = match.group(1).lower()
+            for tag in self._keyword_tags[keyword]:
+                hits.setdefault(tag, set()).add(keyword)
+        return hits
+
+    def _scan_keywords_many(self, texts: Sequence[str]) -> List[KeywordHits]:
+        """``_scan_keywords`` for each of ``texts``, as one pass over all of them.
+
+        The texts must be normalized (lowercase, no newlines): they are
+        joined with newlines, which the scan reports as empty matches
+        separating one text's keywords from the next.
+        """
+        found: List[Set[str]] = [set()]
+        for keyword in self._batch_keyword_pattern.findall("\n".join(texts)):
+            if keyword:
+                found[-1].add(keyword)
+            else:
+                found.append(set())
         
-        return {
-            "progress_percentage": progress_percentage,
-            "sentiment": sentiment,
-            "insights": insights,
-            "processed_at": datetime.utcnow().isoformat()
-        }
+        hits: List[KeywordHits] = []
+        for keywords in found[:len(texts)]:
+            text_hits: KeywordHits = {}
+            for keyword in keywords:
+                for tag in self._keyword_tags[keyword]:
+                    text_hits.setdefault(tag, set()).add(keyword)
+            hits.append(text_hits)
+        return hits
+
+    def analyze_progress_update(self, text: str, goal_title: str) -> Dict[str, Any]:
+        """Analyze a natural language progress update"""
+        return self._analyze_chunk([(text, goal_title)])[0]
+
+    def analyze_batch(
+        self,
+        texts: Sequence[str],
+        goal_titles: Sequence[str],
+        processes: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze many progress updates; results are in the order of ``texts``.
 
-    def _extract_progress_percentage(self, text: str) -> float:
+        ``goal_titles[i]`` is the title of the goal ``texts[i]`` belongs to.
+        With ``processes`` (0 means one per CPU) the texts are split into
+        chunks analyzed in a process pool, which pays off for large backfills.
+        Callers analyzing several batches can pass their own ``executor`` to
+        reuse one pool; ``processes`` is then its size, so each worker gets
+        one chunk.
+        """
+        if len(texts) != len(goal_titles):
+            raise ValueError("texts and goal_titles must have the same length")
+        pairs = list(zip(texts, goal_titles))
+        if (processes is None and executor is None) or len(pairs) < 2:
+            return self._analyze_chunk(pairs)
+        
+        workers = processes or os.cpu_count() or 1
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return self._analyze_in(pool, pairs, workers)
+        return self._analyze_in(executor, pairs, workers)
+
+    def _analyze_in(self, executor: Executor, pairs: List[Tuple[str, str]], workers: int) -> List[Dict[str, Any]]:
+        chunk_size = -(-len(pairs) // workers)
+        chunks = [pairs[start:start + chunk_size] for start in range(0, len(pairs), chunk_size)]
+        # The processor (with its compiled tables) is pickled into each worker
+        return [result for chunk in executor.map(self._analyze_chunk, chunks) for result in chunk]
+
+    def _analyze_chunk(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        processed_at = datetime.utcnow().isoformat()
+        return [
+            {
+                "progress_percentage": self._progress_from_features(features),
+                "sentiment": features.sentiment,
+                "insights": list(features.insights),
+                "processed_at": processed_at
+            }
+            for features in self._text_features(pairs)
+        ]
+
+    def _text_features(self, pairs: Sequence[Tuple[str, str]]) -> List[TextFeatures]:
+        """The cached deterministic analysis of each (text, goal title) pair.
+
+        Texts differing only in case or whitespace share an entry. Pairs not
+        in the cache are analyzed once each, with a single keyword scan over
+        all of their texts.
+        """
+        keys = [(WHITESPACE_PATTERN.sub(" ", text.lower()).strip(), goal_title) for text, goal_title in pairs]
+        found: Dict[Tuple[str, str], Optional[TextFeatures]] = {}
+        misses = []
+        for key in keys:
+            if key not in found:
+                features = self.cache.get(key)
+                if features is None:
+                    misses.append(key)
+                    # Placeholder so a repeated text is only analyzed once
+                    found[key] = None
+                else:
+                    found[key] = features
+
+        for key, hits in zip(misses, self._scan_keywords_many([text_lower for text_lower, _ in misses])):
+            text_lower, goal_title = key
+            found[key] = TextFeatures(
+                explicit_percentage=self._explicit_percentage(text_lower),
+                progress_level=self._progress_level(hits),
+                sentiment=self._analyze_sentiment(text_lower, hits),
+                insights=tuple(self._extract_insights(text_lower, goal_title, hits))
+            )
+            self.cache.set(key, found[key])
+        return [found[key] for key in keys]
+
+    def _progress_from_features(self, features: TextFeatures) -> float:
+        # The keyword estimate is drawn fresh every time; only its level is cached
+        if features.explicit_percentage is not None:
+            return features.explicit_percentage
+        return self._estimate_progress(features.progress_level)
+
+    def _extract_progress_percentage(self, text: str, hits: Optional[KeywordHits] = None) -> float:
         """Extract progress percentage from text"""
+        explicit = self._explicit_percentage(text)
+        if explicit is not None:
+            return explicit
+        
+        # Use keyword-based estimation
+        if hits is None:
+            hits = self._scan_keywords(text)
+        return self._estimate_progress(self._progress_level(hits))
+
+    def _explicit_percentage(self, text: str) -> Optional[float]:
+        """A percentage or fraction stated in the text"""
         # Look for explicit percentages
-        percentage_match = re.search(r'(\d+)%', text)
+        percentage_match = PERCENTAGE_PATTERN.search(text)
         if percentage_match:
             return float(percentage_match.group(1))
         
         # Look for fractions
-        fraction_match = re.search(r'(\d+)/(\d+)', text)
+        fraction_match = FRACTION_PATTERN.search(text)
         if fraction_match:
             numerator = float(fraction_match.group(1))
             denominator = float(fraction_match.group(2))
             return (numerator / denominator) * 100
-        
-        # Use keyword-based estimation
-        for level, keywords in self.progress_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                if level == "high":
-                    return random.uniform(80, 100)
-                elif level == "medium":
-                    return random.uniform(40, 79)
-                else:  # low
-                    return random.uniform(0, 39)
+        return None
+
+    def _progress_level(self, hits: KeywordHits) -> Optional[str]:
+        """The first progress level (high, medium, low) with a keyword in the text"""
+        for level in self.progress_keywords:
+            if ("progress", level) in hits:
+                return level
+        return None
+
+    def _estimate_progress(self, level: Optional[str]) -> float:
+        if level == "high":
+            return random.uniform(80, 100)
+        elif level == "medium":
+            return random.uniform(40, 79)
+        elif level == "low":
+            return random.uniform(0, 39)
         
         # Default to small progress if update is provided
         return random.uniform(5, 15)
 
-    def _analyze_sentiment(self, text: str) -> str:
+    def _analyze_sentiment(self, text: str, hits: Optional[KeywordHits] = None) -> str:
         """Analyze sentiment of the text"""
-        positive_score = sum(1 for word in self.sentiment_keywords["positive"] if word in text)
-        negative_score = sum(1 for word in self.sentiment_keywords["negative"] if word in text)
+        if hits is None:
+            hits = self._scan_keywords(text)
+        # One point per distinct keyword found
+        positive_score = len(hits.get(("sentiment", "positive"), ()))
+        negative_score = len(hits.get(("sentiment", "negative"), ()))
         
         if positive_score > negative_score:
             return "positive"
@@ -78,24 +256,17 @@ class NLPProcessor:
         else:
             return "neutral"
 
-    def _extract_insights(self, text: str, goal_title: str) -> List[str]:
+    def _extract_insights(self, text: str, goal_title: str, hits: Optional[KeywordHits] = None) -> List[str]:
         """Extract key insights from the update"""
-        insights = []
+        if hits is None:
+            hits = self._scan_keywords(text)
         
         # Simple keyword-based insights
-        if any(word in text.lower() for word in ["challenge", "difficult", "problem"]):
-            insights.append("Facing challenges that may need attention")
-        
-        if any(word in text.lower() for word in ["milestone", "achievement", "completed"]):
-            insights.append("Reached an important milestone")
-        
-        if any(word in text.lower() for word in ["plan", "strategy", "approach"]):
-            insights.append("Developing new strategies or approaches")
-        
-        if any(word in text.lower() for word in ["time", "schedule", "deadline"]):
-            insights.append("Time management considerations mentioned")
-        
-        return insights
+        return [insight for insight in self.insight_keywords if ("insight", insight) in hits]
+
+    def generate_feedback_batch(self, goals: Sequence[Any], analyses: Sequence[Dict[str, Any]]) -> List[str]:
+        """Feedback for each (goal, analysis) pair"""
+        return [self.generate_feedback(goal, analysis) for goal, analysis in zip(goals, analyses)]
 
     def generate_feedback(self, goal, analysis: Dict[str, Any]) -> str:
         """Generate AI feedback based on progress analysis"""
@@ -0,0 +1,61 @@
+"""Re-run the NLP analysis over every stored progress entry.
+
+Run after changing the keyword tables in NLPProcessor so that old entries
+are scored the same way as new ones:
+
+    python -m app.reanalyze [--chunk-size 500] [--processes 0] [--dry-run]
+
+Entries are streamed in chunks; each chunk is analyzed with
+``NLPProcessor.analyze_batch`` and its sentiment and key insights are
+written back in one bulk UPDATE and commit. Progress percentages are left
+alone, since they are the history the goal's progress was built from.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import argparse
+import os
+import time
+
+from . import crud
+from .database import SessionLocal
+from .nlp_processor import NLPProcessor
+
+def reanalyze_progress_entries(chunk_size: int = 500, processes=None, dry_run: bool = False) -> int:
+    """Re-score every progress entry and return how many were processed"""
+    processor = NLPProcessor()
+    processed = 0
+    # One pool for the whole run rather than one per chunk
+    pool = ProcessPoolExecutor(max_workers=processes or os.cpu_count()) if processes is not None else nullcontext()
+    with pool as executor, SessionLocal() as db:
+        for rows in crud.iter_progress_entry_chunks(db, chunk_size=chunk_size):
+            analyses = processor.analyze_batch(
+                [row.text for row in rows],
+                [row.title for row in rows],
+                processes=processes,
+                executor=executor
+            )
+            if not dry_run:
+                crud.update_progress_analyses(db, [
+                    {"id": row.id, "sentiment": analysis["sentiment"], "key_insights": analysis["insights"]}
+                    for row, analysis in zip(rows, analyses)
+                ])
+                db.commit()
+            processed += len(rows)
+            print(f"🔄 Re-analyzed {processed} progress entries")
+    return processed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-run NLP analysis over all progress entries")
+    parser.add_argument("--chunk-size", type=int, default=500, help="entries read, analyzed and written per batch")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="analyze in a process pool of this size (0 = one per CPU); default is in-process")
+    parser.add_argument("--dry-run", action="store_true", help="analyze without writing results")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    processed = reanalyze_progress_entries(args.chunk_size, args.processes, args.dry_run)
+    print(f"✅ Re-analyzed {processed} progress entries in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Serialized responses for the hot read endpoints.
+
+``GET /goals/{id}`` and ``GET /dashboard`` keep their encoded JSON bodies
+here with an ETag, so repeat reads skip the database and serialization and
+a matching ``If-None-Match`` gets a 304 straight from memory.
+
+Entries are keyed by a tag plus the request variant, e.g.
+``("goal:5", entries_limit)`` or ``("dashboard", view, entries_limit)``.
+Writes invalidate by tag: a change to goal 5 drops every cached variant of
+``goal:5`` and of ``dashboard``.
+"""
+
+from typing import Awaitable, Callable, Hashable, NamedTuple, Optional, Tuple
+import hashlib
+import os
+import re
+
+from .cache import TTLCache
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+DASHBOARD_TAG = "dashboard"
+
+# One entity-tag of an If-None-Match list (RFC 9110 section 8.8.3); commas may appear inside the quotes
+ENTITY_TAG = re.compile(r'(?:W/)?("[^"]*")')
+
+def goal_tag(goal_id: int) -> str:
+    return f"goal:{goal_id}"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag`` (RFC 9110 section 13.1.2).
+
+    The header is ``*`` or a comma-separated list of entity-tags, compared
+    weakly as the RFC requires for If-None-Match: a ``W/`` prefix is ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # ``etag`` is one of ours, always a strong quoted tag
+    return etag in ENTITY_TAG.findall(if_none_match)
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+class ResponseCache:
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE, ttl: Optional[float] = RESPONSE_CACHE_TTL):
+        self._cache = TTLCache(max_size, ttl)
+        # Bumped by every invalidation; a body built across one is not stored
+        self.generation = 0
+        self.invalidations = 0
+        self.not_modified = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[CachedResponse]:
+        return self._cache.get(key)
+
+    async def get_or_build(self, key: Tuple[Hashable, ...], build: Callable[[], Awaitable[bytes]]) -> CachedResponse:
+        """The cached response for ``key``, building and storing it on a miss"""
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        generation = self.generation
+        body = await build()
+        cached = CachedResponse(body, '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"')
+        # A write landed while we were reading: serve this body but don't keep it
+        if generation == self.generation:
+            self._cache.set(key, cached)
+        return cached
+
+    def invalidate(self, *tags: str):
+        """Drop every cached variant of the given tags"""
+        self.generation += 1
+        self.invalidations += 1
+        wanted = set(tags)
+        for key in self._cache.keys():
+            if key[0] in wanted:
+                self._cache.delete(key)
+
+    def clear(self):
+        """Drop every cached response"""
+        self.generation += 1
+        self.invalidations += 1
+        self._cache.clear()
+
+    def invalidate_goals(self, *goal_ids: int):
+        """Drop the given goals' responses and the dashboard, which shows every goal"""
+        self.invalidate(DASHBOARD_TAG, *(goal_tag(goal_id) for goal_id in goal_ids))
+
+    def stats(self) -> dict:
+        return {
+            **self._cache.stats(),
+            "invalidations": self.invalidations,
+            "not_modified": self.not_modified,
+        }
@@ -1,6 +1,10 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import List, Optional
+import os
+
+# Most updates one POST /progress/batch may carry; larger batches are rejected with 422
+PROGRESS_BATCH_MAX_ITEMS = int(os.getenv("PROGRESS_BATCH_MAX_ITEMS", "500"))
 
 class GoalBase(BaseModel):
     title: str
@@ -19,6 +23,7 @@ class ProgressEntryBase(BaseModel):
 
 class ProgressEntryCreate(ProgressEntryBase):
     goal_id: int
+    created_at: Optional[datetime] = None
 
 class ProgressEntry(ProgressEntryBase):
     model_config = ConfigDict(from_attributes=True)
@@ -37,9 +42,51 @@ class Goal(GoalBase):
     status: str
     progress_entries: List[ProgressEntry] = []
 
+class GoalSummary(BaseModel):
+    id: int
+    title: str
+    category: Optional[str] = None
+    status: str
+    progress_percentage: float
+    updated_at: datetime
+
+class GoalSearchHit(GoalSummary):
+    # Lower is a better match
+    rank: float
+    # Matching progress entries of this goal
+    entry_matches: int
+
+class GoalSearchPage(BaseModel):
+    items: List[GoalSearchHit]
+    next_offset: Optional[int] = None
+
+class GoalPage(BaseModel):
+    items: List[Goal]
+    next_cursor: Optional[str] = None
+
 class ProgressUpdate(BaseModel):
     text: str
 
+class ProgressBatchItem(BaseModel):
+    goal_id: int
+    text: str
+    timestamp: Optional[datetime] = None
+
+class ProgressBatch(BaseModel):
+    updates: List[ProgressBatchItem] = Field(max_length=PROGRESS_BATCH_MAX_ITEMS)
+
+class HistoryPoint(BaseModel):
+    timestamp: datetime
+    value: float
+    average: float
+    count: int
+
+class GoalHistory(BaseModel):
+    goal_id: int
+    bucket: Optional[str] = None
+    total_points: int
+    points: List[HistoryPoint]
+
 class DashboardStats(BaseModel):
     total_goals: int
     completed_goals: int
@@ -0,0 +1,215 @@
+"""Full-text search over goal titles, descriptions and progress entry text.
+
+SQLite keeps two FTS5 tables, created by migration 4: ``goals_fts`` (title,
+description) and ``progress_fts`` (text). Both are external-content tables
+over ``goals`` and ``progress_entries`` keyed by rowid, so the text is not
+stored twice, but they are only as fresh as the crud write functions keep
+them: every write that adds, changes or removes searchable text calls
+``index_*`` / ``unindex_*`` here in the same transaction.
+
+PostgreSQL gets GIN indexes on ``to_tsvector`` expressions instead, which
+the database maintains by itself. Any other database falls back to a LIKE
+scan.
+"""
+
+from typing import Iterable, List, Optional
+import os
+import re
+
+from sqlalchemy import String, column, func, insert, literal, literal_column, or_, select, table, text
+
+from . import models
+
+# Rank weights for goal title and description matches (bm25 column weights)
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 2.0
+
+# Progress entry matches scored per query on SQLite: the newest ones among
+# goals passing the search filters. Every goal with a matching entry is still
+# returned, but beyond these its entries rank below every scored match;
+# scoring every match of a very common word would take time proportional to
+# the table
+SEARCH_ENTRY_CANDIDATES = int(os.getenv("SEARCH_ENTRY_CANDIDATES", "1000"))
+
+# Text search configuration for PostgreSQL
+TS_CONFIG = "english"
+
+goals_fts = table("goals_fts", column("goals_fts"), column("rowid"), column("title"), column("description"))
+progress_fts = table("progress_fts", column("progress_fts"), column("rowid"), column("text"))
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def _dialect(db) -> str:
+    """Dialect name of a Session or Connection"""
+    bind = db.get_bind() if hasattr(db, "get_bind") else db
+    return bind.dialect.name
+
+def uses_fts(db) -> bool:
+    """Whether writes must keep the FTS5 tables in step"""
+    return _dialect(db) == "sqlite"
+
+# Constants are inlined rather than bound, so the query's expression is
+# exactly the indexed one and PostgreSQL can use the index
+_REGCONFIG = literal_column(f"'{TS_CONFIG}'::regconfig")
+_EMPTY = literal_column("''", String)
+_SPACE = literal_column("' '", String)
+
+def goal_document():
+    return func.to_tsvector(
+        _REGCONFIG,
+        func.coalesce(models.Goal.title, _EMPTY) + _SPACE + func.coalesce(models.Goal.description, _EMPTY)
+    )
+
+def entry_document():
+    return func.to_tsvector(_REGCONFIG, models.ProgressEntry.text)
+
+def create(connection):
+    """Create and fill the search index for this database (run by migration 4)"""
+    dialect = _dialect(connection)
+    if dialect == "sqlite":
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS goals_fts USING fts5("
+            "title, description, content='goals', content_rowid='id', tokenize='porter unicode61')"
+        ))
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS progress_fts USING fts5("
+            "text, content='progress_entries', content_rowid='id', tokenize='porter unicode61')"
+        ))
+        rebuild(connection)
+    elif dialect == "postgresql":
+        # Same expressions as goal_document() and entry_document()
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_goals_search ON goals USING gin (to_tsvector('{TS_CONFIG}'::regconfig, "
+            "coalesce(title, '') || ' ' || coalesce(description, '')))"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_progress_entries_search ON progress_entries "
+            f"USING gin (to_tsvector('{TS_CONFIG}'::regconfig, text))"
+        ))
+
+def rebuild(db):
+    """Re-read every goal and entry into the FTS5 tables"""
+    if uses_fts(db):
+        db.execute(insert(goals_fts).values(goals_fts="rebuild"))
+        db.execute(insert(progress_fts).values(progress_fts="rebuild"))
+
+def index_goals(db, goals: Iterable):
+    """Add goals (anything with id, title and description) to the index"""
+    rows = [{"rowid": goal.id, "title": goal.title, "description": goal.description} for goal in goals]
+    if rows and uses_fts(db):
+        db.execute(insert(goals_fts), rows)
+
+def index_entries(db, entries: Iterable):
+    """Add progress entries (anything with id and text) to the index"""
+    rows = [{"rowid": entry.id, "text": entry.text} for entry in entries]
+    if rows and uses_fts(db):
+        db.execute(insert(progress_fts), rows)
+
+def unindex_goals(db, conditions: list, with_entries: bool = True):
+    """Remove the goals matching ``conditions`` (and their entries) from the index.
+
+    Must run before the rows change or go away: external-content FTS5 tables
+    need the indexed values to delete them.
+    """
+    if not uses_fts(db):
+        return
+    goal_ids = select(models.Goal.id).where(*conditions)
+    db.execute(insert(goals_fts).from_select(
+        ["goals_fts", "rowid", "title", "description"],
+        select(literal("delete"), models.Goal.id, models.Goal.title, models.Goal.description).where(*conditions)
+    ))
+    if with_entries:
+        db.execute(insert(progress_fts).from_select(
+            ["progress_fts", "rowid", "text"],
+            select(literal("delete"), models.ProgressEntry.id, models.ProgressEntry.text).where(
+                models.ProgressEntry.goal_id.in_(goal_ids)
+            )
+        ))
+
+def match_query(q: str) -> Optional[str]:
+    """An FTS5 query matching every word of ``q``, the last one as a prefix.
+
+    User input is reduced to quoted word tokens, so FTS5 syntax characters
+    cannot cause query errors. None if ``q`` has no words.
+    """
+    tokens = TOKEN_PATTERN.findall(q)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"' for token in tokens) + "*"
+
+def hit_statements(db, q: str, conditions: Optional[list] = None) -> List:
+    """Selects of (goal_id, rank, entry_matches) for goals and entries matching ``q``.
+
+    ``conditions`` on Goal are the search filters; they are applied before
+    the SQLite entry candidates are picked, so a filtered search scores the
+    newest matches of the goals it can return. Lower ranks are better
+    matches; entry_matches counts every matching entry. Raises ValueError if
+    ``q`` has no words.
+    """
+    conditions = conditions or []
+    query = match_query(q)
+    if query is None:
+        raise ValueError("Search query has no searchable words")
+
+    dialect = _dialect(db)
+    entry = models.ProgressEntry
+    if dialect == "sqlite":
+        goals_match = literal_column("goals_fts")
+        entries_match = literal_column("progress_fts")
+        # Walking the index in rowid order needs no sort, so only the candidates get scored
+        scored = select(
+            entry.goal_id,
+            func.bm25(entries_match).label("rank")
+        ).select_from(progress_fts).join(entry, entry.id == progress_fts.c.rowid)
+        if conditions:
+            scored = scored.join(models.Goal, models.Goal.id == entry.goal_id).where(*conditions)
+        candidates = scored.where(entries_match.op("MATCH")(query)).order_by(
+            progress_fts.c.rowid.desc()
+        ).limit(SEARCH_ENTRY_CANDIDATES).subquery()
+        return [
+            select(
+                goals_fts.c.rowid.label("goal_id"),
+                func.bm25(goals_match, TITLE_WEIGHT, DESCRIPTION_WEIGHT).label("rank"),
+                literal(0).label("entry_matches")
+            ).where(goals_match.op("MATCH")(query)),
+            select(
+                candidates.c.goal_id,
+                candidates.c.rank,
+                literal(0).label("entry_matches")
+            ),
+            # Every goal with a matching entry, unscored: bm25 ranks are negative, so 0 ranks last
+            select(
+                entry.goal_id,
+                literal(0.0).label("rank"),
+                func.count().label("entry_matches")
+            ).select_from(progress_fts).join(entry, entry.id == progress_fts.c.rowid).where(
+                entries_match.op("MATCH")(query)
+            ).group_by(entry.goal_id),
+        ]
+
+    if dialect == "postgresql":
+        ts_query = func.plainto_tsquery(_REGCONFIG, q)
+        return [
+            select(
+                models.Goal.id.label("goal_id"),
+                (-func.ts_rank(goal_document(), ts_query)).label("rank"),
+                literal(0).label("entry_matches")
+            ).where(goal_document().op("@@")(ts_query)),
+            select(
+                entry.goal_id,
+                (-func.ts_rank(entry_document(), ts_query)).label("rank"),
+                literal(1).label("entry_matches")
+            ).where(entry_document().op("@@")(ts_query)),
+        ]
+
+    # No full-text support: every word must appear somewhere in the text
+    words = TOKEN_PATTERN.findall(q)
+    return [
+        select(models.Goal.id.label("goal_id"), literal(0.0).label("rank"), literal(0).label("entry_matches")).where(*[
+            or_(models.Goal.title.ilike(f"%{word}%"), models.Goal.description.ilike(f"%{word}%"))
+            for word in words
+        ]),
+        select(entry.goal_id, literal(0.0).label("rank"), literal(1).label("entry_matches")).where(*[
+            entry.text.ilike(f"%{word}%") for word in words
+        ]),
+    ]
@@ -1,32 +1,529 @@
 from fastapi import WebSocket
-from typing import List
+from collections import deque
+from itertools import islice
+from typing import Callable, Deque, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import asyncio
 import json
+import os
+import time
+import uuid
+
+from .broadcast_backend import RESYNC_REQUIRED, BroadcastBackend, create_backend
+from .event_coalescer import COALESCE_WINDOW_MS, EventCoalescer, merge_events, merge_key, touched_goals
+from .event_encoding import EncodedEvent, JSON, SUBPROTOCOLS, available_encodings
+
+# Outbound queue settings for each connection
+SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "100"))
+SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+
+# What to do when a client's queue is full:
+#   drop_oldest - discard the oldest queued message
+#   coalesce    - merge with a queued message about the same goal (by the
+#                 EventCoalescer rules, so no change is lost), else drop the oldest
+#   disconnect  - close the slow client
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+# Number of recent events kept for replay to reconnecting clients
+EVENT_LOG_SIZE = int(os.getenv("WS_EVENT_LOG_SIZE", "1000"))
+
+# Close code for clients disconnected by the "disconnect" policy
+SLOW_CONSUMER_CLOSE_CODE = 1008
+
+# Heartbeat: clients not heard from for WS_HEARTBEAT_INTERVAL seconds are
+# pinged and must answer {"action": "pong"}; clients silent for
+# WS_HEARTBEAT_TIMEOUT seconds are treated as dead and reaped
+HEARTBEAT_INTERVAL = float(os.getenv("WS_HEARTBEAT_INTERVAL", "20"))
+HEARTBEAT_TIMEOUT = float(os.getenv("WS_HEARTBEAT_TIMEOUT", "60"))
+HEARTBEAT_CLOSE_CODE = 1001
+
+# Connections beyond this many are closed right after the handshake (0 = no limit)
+MAX_CONNECTIONS = int(os.getenv("WS_MAX_CONNECTIONS", "1000"))
+# "Try again later"
+OVER_CAPACITY_CLOSE_CODE = 1013
+
+# Topics a client may subscribe to:
+#   *               - every event (the default for new connections)
+#   goal:{id}       - events about one goal
+#   category:{name} - events about goals in one category
+#   stats           - dashboard statistics updates
+ALL_TOPICS = "*"
+STATS_TOPIC = "stats"
+TOPIC_PREFIXES = ("goal:", "category:")
+MAX_TOPICS_PER_CLIENT = int(os.getenv("WS_MAX_TOPICS", "100"))
+
+class ClientConnection:
+    """A WebSocket plus the bounded queue its writer task drains"""
+
+    def __init__(self, websocket: WebSocket, queue_size: int, policy: str, encoding: str = JSON):
+        self.websocket = websocket
+        self.queue_size = queue_size
+        self.policy = policy
+        self.encoding = encoding
+        self.dropped = 0
+        self.closed = False
+        self.writer: Optional[asyncio.Task] = None
+        self.topics: Set[str] = set()
+        # When the client last sent anything, for heartbeat reaping
+        self.last_seen = time.monotonic()
+        self._pending: Deque[Tuple[Optional[Hashable], EncodedEvent]] = deque()
+        self._wakeup = asyncio.Event()
+
+    def enqueue(self, message: EncodedEvent, key: Optional[Hashable] = None) -> bool:
+        """Queue a message without waiting for the socket.
+
+        Returns False when the client is over its limit under the
+        "disconnect" policy and should be dropped.
+        """
+        if self.closed:
+            return False
+        if len(self._pending) >= self.queue_size:
+            if self.policy == "disconnect":
+                return False
+            if self.policy == "coalesce" and key is not None and self._merge_queued(key, message):
+                return True
+            self._pending.popleft()
+            self.dropped += 1
+        self._pending.append((key, message))
+        self._wakeup.set()
+        return True
+
+    def _merge_queued(self, key: Hashable, message: EncodedEvent) -> bool:
+        """Fold ``message`` into the newest queued message with the same key.
+
+        The merged message takes the place and seq of ``message``, so the
+        client still sees each goal's events in order; a goal_created that
+        meets its goal_deleted is dropped together with it. Nothing is merged
+        when a batch message about the goal is queued after the old one, as
+        the merge would overtake it.
+        """
+        goal_ids = touched_goals(message.event)
+        for index in range(len(self._pending) - 1, -1, -1):
+            queued_key, queued = self._pending[index]
+            if queued_key != key:
+                # Unkeyed messages (batches, replays) about the goal must not be overtaken
+                if goal_ids and queued_key is None and goal_ids & touched_goals(queued.event):
+                    return False
+                continue
+            del self._pending[index]
+            merged = merge_events(queued.event, message.event)
+            if merged is None:
+                self.dropped += 2
+                return True
+            if merged is not message.event:
+                topics = queued.topics + tuple(topic for topic in message.topics if topic not in queued.topics)
+                message = EncodedEvent({**merged, "seq": message.event["seq"]}, topics)
+            self._pending.append((key, message))
+            self.dropped += 1
+            self._wakeup.set()
+            return True
+        return False
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    async def write_loop(self):
+        """Send queued messages in order until the connection is closed"""
+        while not self.closed:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            _, message = self._pending.popleft()
+            # Frames are cached on the event, so each encoding is built once for all clients
+            await self.websocket.send(message.asgi_message(self.encoding))
+
+    def close(self):
+        self.closed = True
+        self._pending.clear()
+        if self.writer is not None and self.writer is not asyncio.current_task():
+            self.writer.cancel()
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(
+        self,
+        queue_size: int = SEND_QUEUE_SIZE,
+        policy: str = SLOW_CONSUMER_POLICY,
+        event_log_size: int = EVENT_LOG_SIZE,
+        backend: Optional[BroadcastBackend] = None,
+        max_connections: int = MAX_CONNECTIONS,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        heartbeat_timeout: float = HEARTBEAT_TIMEOUT,
+        coalesce_window_ms: float = COALESCE_WINDOW_MS
+    ):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        self.queue_size = queue_size
+        self.policy = policy
+        # Carries broadcasts to every worker; each worker then fans out to its own clients
+        self.backend = backend if backend is not None else create_backend()
+        # Optional window in which bursts of events about one goal are merged before publishing
+        self.coalescer = EventCoalescer(self.backend.publish, coalesce_window_ms) if coalesce_window_ms > 0 else None
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.max_connections = max_connections
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.slow_disconnects = 0
+        self.reaped_connections = 0
+        self.rejected_connections = 0
+        # Times the backend reported that this worker missed events
+        self.resyncs = 0
+        self._heartbeat: Optional[asyncio.Task] = None
+        # Every delivered event gets this worker's next sequence number; recent ones are kept for replay.
+        # The epoch names this numbering, so clients can tell when it restarted at 0 (e.g. after a restart)
+        self.epoch = uuid.uuid4().hex[:12]
+        self.last_seq = 0
+        self._event_log: Deque[EncodedEvent] = deque(maxlen=event_log_size)
+        # topic -> clients subscribed to it, so a broadcast only visits interested sockets
+        self._subscribers: Dict[str, Set[ClientConnection]] = {}
+        # Called with every event this worker delivers, including other workers' broadcasts
+        self._listeners: List[Callable[[dict], None]] = []
+
+    def add_listener(self, listener: Callable[[dict], None]):
+        """Call ``listener(event)`` for every delivered event, before clients get it"""
+        self._listeners.append(listener)
+
+    async def start(self):
+        await self.backend.start(self._deliver)
+        if self.heartbeat_interval > 0:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self.coalescer is not None:
+            await self.coalescer.flush()
+        await self.backend.stop()
+
+    async def connect(self, websocket: WebSocket) -> bool:
+        """Accept a client, subscribed to ``?topics=`` (comma separated) or everything.
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+        Returns False if the server is at ``max_connections``; the client is
+        then closed with code 1013 and should retry later.
+        """
+        encoding, subprotocol = _negotiate_encoding(websocket)
+        await websocket.accept(subprotocol=subprotocol)
+        if self.max_connections and len(self.active_connections) >= self.max_connections:
+            self.rejected_connections += 1
+            await _close_quietly(websocket, OVER_CAPACITY_CLOSE_CODE)
+            return False
+        
+        client = ClientConnection(websocket, self.queue_size, self.policy, encoding)
+        client.writer = asyncio.create_task(self._run_writer(client))
+        self.active_connections[websocket] = client
+        
+        requested = websocket.query_params.get("topics")
+        self.subscribe(websocket, requested.split(",") if requested else [ALL_TOPICS])
+        return True
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        client = self.active_connections.pop(websocket, None)
+        if client is not None:
+            self._remove_topics(client, list(client.topics))
+            client.close()
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """Add valid ``topics`` to a client's subscriptions and return them all"""
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return []
+        for topic in topics:
+            if len(client.topics) >= MAX_TOPICS_PER_CLIENT:
+                break
+            topic = normalize_topic(topic)
+            if topic is not None and topic not in client.topics:
+                client.topics.add(topic)
+                self._subscribers.setdefault(topic, set()).add(client)
+        return sorted(client.topics)
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """Drop ``topics`` from a client's subscriptions and return what is left"""
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return []
+        self._remove_topics(client, [normalize_topic(topic) for topic in topics])
+        return sorted(client.topics)
+
+    def _remove_topics(self, client: ClientConnection, topics: List[Optional[str]]):
+        for topic in topics:
+            if topic not in client.topics:
+                continue
+            client.topics.discard(topic)
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def has_subscribers(self, topic: str) -> bool:
+        """Whether an event on ``topic`` would reach anyone"""
+        if not self.backend.is_local:
+            # Subscribers may be connected to other workers
+            return True
+        return bool(self._subscribers.get(topic) or self._subscribers.get(ALL_TOPICS))
+
+    def _recipients(self, topics: Tuple[str, ...]) -> Set[ClientConnection]:
+        recipients = set(self._subscribers.get(ALL_TOPICS, ()))
+        for topic in topics:
+            recipients.update(self._subscribers.get(topic, ()))
+        return recipients
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self.check_heartbeats()
 
-    async def broadcast(self, data: dict):
-        message = json.dumps(data)
-        disconnected = []
+    def check_heartbeats(self, now: Optional[float] = None):
+        """Reap clients silent past the timeout and ping the ones gone quiet"""
+        now = time.monotonic() if now is None else now
+        ping = None
+        for client in list(self.active_connections.values()):
+            silent_for = now - client.last_seen
+            if silent_for >= self.heartbeat_timeout:
+                # Half-open or idle socket: stop queueing for it and close it
+                self.reaped_connections += 1
+                self.disconnect(client.websocket)
+                asyncio.create_task(_close_quietly(client.websocket, HEARTBEAT_CLOSE_CODE))
+            elif silent_for >= self.heartbeat_interval:
+                if ping is None:
+                    ping = EncodedEvent({"type": "ping", "data": {}})
+                if not client.enqueue(ping):
+                    self._drop_slow_client(client)
+
+    async def _run_writer(self, client: ClientConnection):
+        try:
+            await client.write_loop()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Send failed: the socket is gone
+            self.disconnect(client.websocket)
+
+    async def send_event(self, event: dict, websocket: WebSocket):
+        """Queue an event for one client only"""
+        client = self.active_connections.get(websocket)
+        if client is not None and not client.enqueue(EncodedEvent(event)):
+            self._drop_slow_client(client)
+
+    async def broadcast(self, data: dict, topics: Iterable[str] = ()):
+        """Publish ``data`` on ``topics`` to the clients of every worker"""
+        if self.coalescer is not None:
+            self.coalescer.add(data, list(topics))
+        else:
+            await self.backend.publish(data, list(topics))
+
+    async def _deliver(self, data: dict, topics: List[str]):
+        """Number ``data``, log it for replay and queue it for this worker's
+        clients subscribed to any of ``topics`` (or to everything).
+
+        A ``resync_required`` from the backend means this worker missed
+        events: nothing before it can be replayed and every client gets it.
+
+        Never waits on a socket.
+        """
+        self.last_seq += 1
+        event = {"seq": self.last_seq, "epoch": self.epoch, **data}
+        message = EncodedEvent(event, tuple(topics))
+        resync = data.get("type") == RESYNC_REQUIRED["type"]
+        if resync:
+            self.resyncs += 1
+            self._event_log.clear()
+        self._event_log.append(message)
+        for listener in self._listeners:
+            listener(event)
         
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                disconnected.append(connection)
+        key = merge_key(event)
+        recipients = set(self.active_connections.values()) if resync else self._recipients(message.topics)
+        for client in recipients:
+            if not client.enqueue(message, key):
+                self._drop_slow_client(client)
+
+    def snapshot_position(self) -> Tuple[Optional[int], Optional[str]]:
+        """(seq, epoch) a REST snapshot read now can be resumed from.
+
+        (None, None) with a multi-worker backend: each worker numbers events
+        itself, and the client's socket may be on a different worker.
+        """
+        if not self.backend.is_local:
+            return None, None
+        return self.last_seq, self.epoch
+
+    def events_since(
+        self,
+        since: int,
+        topics: Optional[Iterable[str]] = None,
+        epoch: Optional[str] = None
+    ) -> Optional[List[dict]]:
+        """Logged events with seq > ``since``, or None if the client must resync.
+
+        With ``topics``, only events on at least one of them are returned.
+        See ``_messages_since`` for when a resync is needed.
+        """
+        messages = self._messages_since(since, epoch)
+        if messages is None:
+            return None
+        if topics is not None:
+            wanted = {normalize_topic(topic) for topic in topics}
+            messages = [message for message in messages if _matches(message, wanted)]
+        return [message.event for message in messages]
+
+    def _messages_since(self, since: int, epoch: Optional[str] = None) -> Optional[List[EncodedEvent]]:
+        """Logged messages after ``since``, or None if they cannot be replayed.
+
+        That is the case when ``epoch`` belongs to another numbering (the
+        server restarted or this is another worker), when ``since`` is ahead
+        of this numbering, or when events after it were evicted from the log.
+        """
+        if (epoch is not None and epoch != self.epoch) or since > self.last_seq:
+            return None
+        if since == self.last_seq:
+            return []
+        first_seq = self.last_seq - len(self._event_log) + 1
+        if since + 1 < first_seq:
+            return None
+        return list(islice(self._event_log, since + 1 - first_seq, None))
+
+    async def handle_client_message(self, websocket: WebSocket, text: str):
+        """React to a message from a client.
+
+        ``{"action": "replay", "since": <seq>, "epoch": <epoch>}`` re-sends
+        every event after ``since``, or a ``resync_required`` event if they
+        cannot be replayed (see ``_messages_since``, or no ``since`` at all)
+        and the client must reload from /dashboard. Only events on the
+        client's current topics are replayed; ``resync_required`` is sent
+        whatever the topics.
+
+        ``{"action": "subscribe" | "unsubscribe", "topics": [...]}`` changes
+        the client's topics and is answered with a ``subscriptions`` event
+        listing them.
+
+        ``{"action": "pong"}`` answers a heartbeat ping; any message counts
+        as a sign of life.
+        """
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            client.last_seen = time.monotonic()
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(message, dict):
+            return
         
-        # Remove disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
\ No newline at end of file
+        action = message.get("action")
+        if action in ("subscribe", "unsubscribe"):
+            topics = message.get("topics")
+            if isinstance(topics, str):
+                topics = [topics]
+            if not isinstance(topics, list):
+                return
+            change = self.subscribe if action == "subscribe" else self.unsubscribe
+            current = change(websocket, topics)
+            await self.send_event({"type": "subscriptions", "data": {"topics": current}}, websocket)
+        elif action == "replay":
+            try:
+                since = int(message["since"])
+            except (KeyError, TypeError, ValueError):
+                # A client that does not know where it is must resync
+                since = None
+            epoch = message.get("epoch")
+            client = self.active_connections.get(websocket)
+            if client is None:
+                return
+            # Replay reuses the frames already encoded for the live broadcast
+            messages = self._messages_since(since, epoch if isinstance(epoch, str) else None) if since is not None else None
+            if messages is None:
+                # Not on any topic: every client must hear it, whatever it subscribed to
+                messages = [self._resync_message()]
+            else:
+                messages = [message for message in messages if _matches(message, client.topics)]
+            for message in messages:
+                if not client.enqueue(message):
+                    self._drop_slow_client(client)
+                    return
+
+    def _resync_message(self) -> EncodedEvent:
+        """Tells a client to reload from /dashboard"""
+        return EncodedEvent({"seq": self.last_seq, "epoch": self.epoch, "type": "resync_required", "data": {}})
+
+    def _drop_slow_client(self, client: ClientConnection):
+        self.slow_disconnects += 1
+        self.disconnect(client.websocket)
+        asyncio.create_task(_close_quietly(client.websocket, SLOW_CONSUMER_CLOSE_CODE))
+
+    def stats(self) -> dict:
+        clients = list(self.active_connections.values())
+        return {
+            "connections": len(clients),
+            "slow_consumer_policy": self.policy,
+            "queued_messages": sum(client.queue_depth for client in clients),
+            "max_queue_depth": max((client.queue_depth for client in clients), default=0),
+            "dropped_messages": sum(client.dropped for client in clients),
+            "slow_disconnects": self.slow_disconnects,
+            "reaped_connections": self.reaped_connections,
+            "rejected_connections": self.rejected_connections,
+            "max_connections": self.max_connections,
+            "epoch": self.epoch,
+            "last_seq": self.last_seq,
+            "logged_events": len(self._event_log),
+            "broadcast_backend": type(self.backend).__name__,
+            "broadcast_send_errors": getattr(self.backend, "send_errors", 0),
+            "broadcast_resyncs": self.resyncs,
+            "coalescing": None if self.coalescer is None else {
+                "window_ms": self.coalescer.window * 1000,
+                "received": self.coalescer.received,
+                "published": self.coalescer.published,
+                "pending": self.coalescer.pending,
+            },
+            "subscriptions": {topic: len(clients) for topic, clients in self._subscribers.items()},
+        }
+
+def normalize_topic(topic) -> Optional[str]:
+    """The canonical form of a topic name, or None if it is not one we publish"""
+    if not isinstance(topic, str):
+        return None
+    topic = topic.strip()
+    if topic in (ALL_TOPICS, STATS_TOPIC):
+        return topic
+    for prefix in TOPIC_PREFIXES:
+        if topic.startswith(prefix) and len(topic) > len(prefix):
+            return topic
+    return None
+
+def goal_topics(goal_id: int, *categories: Optional[str]) -> List[str]:
+    """Topics for an event about one goal in the given categories"""
+    topics = [f"goal:{goal_id}"]
+    for category in categories:
+        topic = category_topic(category)
+        if topic not in topics:
+            topics.append(topic)
+    return topics
+
+def category_topic(category: Optional[str]) -> str:
+    # Goals without a category are grouped the same way as in the statistics
+    return f"category:{category or 'Uncategorized'}"
+
+def _matches(message: EncodedEvent, topics) -> bool:
+    """Whether a client on ``topics`` receives ``message``"""
+    return ALL_TOPICS in topics or any(topic in topics for topic in message.topics)
+
+def _negotiate_encoding(websocket: WebSocket) -> Tuple[str, Optional[str]]:
+    """Pick the frame encoding from the offered subprotocols or ?encoding=.
+
+    Returns the encoding and the subprotocol to accept (None if the client
+    did not offer one we support). Unsupported requests fall back to JSON.
+    """
+    encodings = available_encodings()
+    for subprotocol in websocket.scope.get("subprotocols", []):
+        encoding = SUBPROTOCOLS.get(subprotocol)
+        if encoding in encodings:
+            return encoding, subprotocol
+    encoding = websocket.query_params.get("encoding", JSON)
+    return (encoding if encoding in encodings else JSON), None
+
+async def _close_quietly(websocket: WebSocket, code: int):
+    try:
+        await websocket.close(code=code)
+    except Exception:
+        pass
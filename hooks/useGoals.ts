@@ -1,5 +1,5 @@
 import { useState, useCallback } from 'react'
-import { Goal } from '../types'
+import { Goal, ProgressEntry } from '../types'
 
 export function useGoals() {
   const [goals, setGoals] = useState<Goal[]>([])
@@ -31,6 +31,23 @@ export function useGoals() {
     ))
   }, [])
 
+  // Apply a delta event: merge changed fields and prepend new progress entries
+  const patchGoal = useCallback((goalId: number, changes: Partial<Goal>, newEntries: ProgressEntry[] = []) => {
+    setGoals(prev => prev.map(goal => {
+      if (goal.id !== goalId) {
+        return goal
+      }
+      // Replayed events may repeat entries we already have
+      const knownIds = new Set((goal.progress_entries || []).map(entry => entry.id))
+      const freshEntries = newEntries.filter(entry => !knownIds.has(entry.id))
+      return {
+        ...goal,
+        ...changes,
+        progress_entries: [...freshEntries, ...(goal.progress_entries || [])]
+      }
+    }))
+  }, [])
+
   // Remove goal
   const removeGoal = useCallback((goalId: number) => {
     setGoals(prev => prev.filter(goal => goal.id !== goalId))
@@ -62,6 +79,7 @@ export function useGoals() {
     goals,
     addGoal,
     updateGoal,
+    patchGoal,
     removeGoal,
     setAllGoals,
     clearGoals
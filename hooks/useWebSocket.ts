@@ -4,12 +4,18 @@ interface UseWebSocketReturn {
   lastMessage: MessageEvent | null
   connectionStatus: 'Connecting' | 'Connected' | 'Disconnected'
   sendMessage: (message: string) => void
+  resumeFrom: (seq: number | null, epoch: string | null) => void
 }
 
 export function useWebSocket(url: string): UseWebSocketReturn {
   const [lastMessage, setLastMessage] = useState<MessageEvent | null>(null)
   const [connectionStatus, setConnectionStatus] = useState<'Connecting' | 'Connected' | 'Disconnected'>('Connecting')
   const ws = useRef<WebSocket | null>(null)
+  // Sequence number of the last event seen, so a reconnect can replay what it missed
+  const lastSeq = useRef<number | null>(null)
+  // Server numbering lastSeq belongs to; a new epoch restarts the count
+  const epoch = useRef<string | null>(null)
+  const reconnecting = useRef(false)
 
   useEffect(() => {
     const connect = () => {
@@ -18,9 +24,34 @@ export function useWebSocket(url: string): UseWebSocketReturn {
 
         ws.current.onopen = () => {
           setConnectionStatus('Connected')
+          if (lastSeq.current !== null) {
+            ws.current?.send(JSON.stringify({ action: 'replay', since: lastSeq.current, epoch: epoch.current }))
+          } else if (reconnecting.current) {
+            // Nothing to replay from, but events may have been missed: the server answers resync_required
+            ws.current?.send(JSON.stringify({ action: 'replay' }))
+          }
+          reconnecting.current = true
         }
 
         ws.current.onmessage = (event) => {
+          try {
+            const message = JSON.parse(event.data)
+            if (message.type === 'ping') {
+              // Heartbeat: answer so the server keeps the connection
+              ws.current?.send(JSON.stringify({ action: 'pong' }))
+              return
+            }
+            if (typeof message.seq === 'number') {
+              if (message.epoch !== epoch.current) {
+                epoch.current = message.epoch ?? null
+                lastSeq.current = message.seq
+              } else {
+                lastSeq.current = Math.max(lastSeq.current ?? 0, message.seq)
+              }
+            }
+          } catch (error) {
+            // Not an event; leave the sequence number alone
+          }
           setLastMessage(event)
         }
 
@@ -54,5 +85,18 @@ export function useWebSocket(url: string): UseWebSocketReturn {
     }
   }
 
-  return { lastMessage, connectionStatus, sendMessage }
+  // Record the sequence number a REST snapshot (e.g. /dashboard) corresponds to
+  // (null when the server runs several workers: keep following the socket's own numbering)
+  const resumeFrom = (seq: number | null, snapshotEpoch: string | null) => {
+    if (seq === null) {
+      return
+    }
+    lastSeq.current = seq
+    epoch.current = snapshotEpoch
+    if (ws.current && ws.current.readyState === WebSocket.OPEN) {
+      ws.current.send(JSON.stringify({ action: 'replay', since: seq, epoch: snapshotEpoch }))
+    }
+  }
+
+  return { lastMessage, connectionStatus, sendMessage, resumeFrom }
 }
\ No newline at end of file
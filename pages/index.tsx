@@ -6,17 +6,17 @@ import { AddGoalForm } from '../components/AddGoalForm'
 import { ProgressChart } from '../components/ProgressChart'
 import { useWebSocket } from '../hooks/useWebSocket'
 import { useGoals } from '../hooks/useGoals'
-import { Goal, DashboardStats } from '../types'
+import { Goal, GoalDelta, DashboardStats } from '../types'
 
 export default function Dashboard() {
-  const { goals, addGoal, updateGoal, removeGoal, setAllGoals } = useGoals()
+  const { goals, addGoal, updateGoal, patchGoal, removeGoal, setAllGoals } = useGoals()
   const [stats, setStats] = useState<DashboardStats | null>(null)
   const [loading, setLoading] = useState(true)
   const [showAddForm, setShowAddForm] = useState(false)
 
   // WebSocket connection for real-time updates
   const wsUrl = (process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000').replace('http', 'ws') + '/ws'
-  const { lastMessage, connectionStatus } = useWebSocket(wsUrl)
+  const { lastMessage, connectionStatus, resumeFrom } = useWebSocket(wsUrl)
 
   // Debug WebSocket messages
   useEffect(() => {
@@ -30,26 +30,37 @@ export default function Dashboard() {
     fetchDashboardData()
   }, [])
 
-  // Handle WebSocket messages
+  // Handle WebSocket messages (compact delta events)
   useEffect(() => {
     if (lastMessage) {
       const data = JSON.parse(lastMessage.data)
 
       if (data.type === 'goal_created') {
-        console.log('Adding goal from WebSocket:', data.data.id)
-        addGoal(data.data)
+        console.log('Adding goal from WebSocket:', data.data.goal_id)
+        addGoal({ progress_entries: [], ...data.data.goal })
       } else if (data.type === 'progress_updated') {
         console.log('Updating goal progress from WebSocket:', data.data.goal_id)
-        updateGoal(data.data.updated_goal)
+        patchGoal(data.data.goal_id, data.data.changes, data.data.entries)
       } else if (data.type === 'goal_deleted') {
         console.log('Removing goal from WebSocket:', data.data.goal_id)
         removeGoal(data.data.goal_id)
+      } else if (data.type === 'goals_deleted') {
+        console.log('Removing goals from WebSocket:', data.data.goal_ids.length)
+        data.data.goal_ids.forEach((goalId: number) => removeGoal(goalId))
       } else if (data.type === 'goal_updated') {
-        console.log('Updating goal from WebSocket:', data.data.id)
-        updateGoal(data.data)
+        console.log('Updating goal from WebSocket:', data.data.goal_id)
+        patchGoal(data.data.goal_id, data.data.changes)
+      } else if (data.type === 'progress_batch_updated') {
+        console.log('Updating goals from batch progress:', data.data.goals.length)
+        data.data.goals.forEach((update: GoalDelta) => patchGoal(update.goal_id, update.changes, update.entries))
+      } else if (data.type === 'stats_updated') {
+        setStats(data.data.statistics)
+      } else if (data.type === 'goals_imported' || data.type === 'resync_required') {
+        console.log('Reloading dashboard from WebSocket:', data.type)
+        fetchDashboardData()
       }
     }
-  }, [lastMessage, addGoal, updateGoal, removeGoal])
+  }, [lastMessage, addGoal, patchGoal, removeGoal])
 
   const fetchDashboardData = async () => {
     try {
@@ -58,6 +69,7 @@ export default function Dashboard() {
       const data = await response.json()
       setAllGoals(data.goals)
       setStats(data.statistics)
+      resumeFrom(data.seq, data.epoch)
     } catch (error) {
       console.error('Failed to fetch dashboard data:', error)
     } finally {
@@ -85,9 +97,8 @@ export default function Dashboard() {
     }
   }
   const handleGoalDeleted = (goalId: number) => {
+    // Stats arrive with the stats_updated event that follows the deletion
     removeGoal(goalId)
-    // Refresh stats after deletion
-    fetchDashboardData()
   }
 
   if (loading) {
@@ -20,6 +20,8 @@ echo ""
 echo "📋 Available individual tests:"
 echo "  Database:     python tests/api/test_simple_db.py"
 echo "  Delete Only:  python tests/api/test_delete_only.py"
+echo "  Statistics:   python tests/api/test_statistics.py"
+echo "  Progress:     python tests/api/test_record_progress.py"
 echo "  API (server): python tests/api/test_api.py"
 echo "  Debug:        python tests/api/debug_delete_issue.py"
 echo "  Start Server: python tests/debug/debug_start.py"
@@ -28,8 +28,8 @@ def test_api():
     try:
         response = requests.get(f"{base_url}/goals")
         if response.status_code == 200:
-            goals = response.json()
-            print(f"✅ Get goals successful: {len(goals)} goals found")
+            page = response.json()
+            print(f"✅ Get goals successful: {len(page['items'])} goals on first page")
         else:
             print(f"❌ Get goals failed: {response.status_code}")
             return False
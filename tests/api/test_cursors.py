@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test keyset pagination cursors for GET /goals
+"""
+
+import sys
+import os
+import base64
+from datetime import datetime
+from types import SimpleNamespace
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from app.database import SessionLocal, engine
+from app import migrations, schemas, crud
+
+def check(description, passed):
+    print(f"{'✅' if passed else '❌'} {description}")
+    return passed
+
+def rejects(cursor):
+    try:
+        crud.decode_cursor(cursor)
+    except ValueError:
+        return True
+    return False
+
+def test_cursor_encoding():
+    print("🔖 Testing Cursor Encoding")
+    print("=" * 50)
+    created_at = datetime(2026, 3, 1, 10, 30, 15, 123456)
+    cursor = crud.encode_cursor(SimpleNamespace(created_at=created_at, id=42))
+    print(f"📋 Cursor: {cursor}")
+    return all([
+        check("decodes back to (created_at, id)", crud.decode_cursor(cursor) == (created_at, 42)),
+        check("is URL safe without padding", "=" not in cursor and "+" not in cursor and "/" not in cursor),
+        check("rejects text that is not base64", rejects("not a cursor!")),
+        check("rejects JSON that is not a pair", rejects(base64.urlsafe_b64encode(b"5").decode())),
+        check("rejects a bad timestamp", rejects(base64.urlsafe_b64encode(b'["yesterday", 1]').decode())),
+        check("rejects a bad id", rejects(base64.urlsafe_b64encode(b'["2026-03-01T00:00:00", "x"]').decode())),
+    ])
+
+def test_pagination():
+    print("\n📄 Testing Cursor Pagination")
+    print("=" * 50)
+    migrations.migrate(engine)
+    db = SessionLocal()
+    goal_ids = []
+    category = "Test Cursor Pages"
+
+    try:
+        for number in range(5):
+            goal_ids.append(crud.create_goal(db=db, goal=schemas.GoalCreate(
+                title=f"Test Cursor Goal {number}",
+                category=category
+            )).id)
+        # Same created_at for several goals: the id breaks the tie
+        for goal in crud.get_goals(db, category=category):
+            goal.created_at = datetime(2026, 3, 1)
+        db.commit()
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            goals, cursor = crud.get_goals_page(db, page_size=2, cursor=cursor, category=category)
+            seen.extend(goal.id for goal in goals)
+            pages += 1
+            if cursor is None:
+                break
+        print(f"📋 {pages} pages: {seen}")
+        return all([
+            check("every goal is returned exactly once", sorted(seen) == sorted(goal_ids) and len(seen) == 5),
+            check("goals with the same created_at are ordered by id", seen == sorted(goal_ids)),
+            check("the last page has no next cursor", pages == 3),
+        ])
+
+    except Exception as e:
+        print(f"❌ Error during pagination test: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        crud.delete_goals(db, ids=goal_ids)
+        db.close()
+
+if __name__ == "__main__":
+    passed = test_cursor_encoding()
+    passed = test_pagination() and passed
+    sys.exit(0 if passed else 1)
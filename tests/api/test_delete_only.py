@@ -10,13 +10,14 @@ import os
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 
-from app.database import SessionLocal
-from app import models, schemas, crud
+from app.database import SessionLocal, engine
+from app import migrations, models, schemas, crud
 
 def test_delete_functionality():
     print("🗑️ Testing Delete Functionality")
     print("=" * 50)
     
+    migrations.migrate(engine)
     db = SessionLocal()
     
     try:
@@ -77,4 +78,4 @@ def test_delete_functionality():
         db.close()
 
 if __name__ == "__main__":
-    test_delete_functionality()
\ No newline at end of file
+    sys.exit(0 if test_delete_functionality() else 1)
\ No newline at end of file
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test the merge rules of the broadcast event coalescer
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from app.event_coalescer import EventCoalescer, merge_events
+
+def created(goal_id, **goal):
+    return {"type": "goal_created", "data": {"goal_id": goal_id, "goal": {"id": goal_id, **goal}}}
+
+def delta(event_type, goal_id, changes, entries=None):
+    data = {"goal_id": goal_id, "changes": changes}
+    if entries is not None:
+        data["entries"] = entries
+    return {"type": event_type, "data": data}
+
+def deleted(goal_id):
+    return {"type": "goal_deleted", "data": {"goal_id": goal_id}}
+
+def check(description, passed):
+    print(f"{'✅' if passed else '❌'} {description}")
+    return passed
+
+def test_merge_rules():
+    print("🔀 Testing Event Merge Rules")
+    print("=" * 50)
+    results = []
+
+    merged = merge_events(
+        created(1, title="Old", progress_percentage=0),
+        delta("progress_updated", 1, {"progress_percentage": 40}, [{"id": 7, "text": "Halfway"}])
+    )
+    results.append(check(
+        "create + update stays goal_created with the changes applied",
+        merged["type"] == "goal_created"
+        and merged["data"]["goal"]["title"] == "Old"
+        and merged["data"]["goal"]["progress_percentage"] == 40
+        and merged["data"]["goal"]["progress_entries"] == [{"id": 7, "text": "Halfway"}]
+    ))
+
+    results.append(check(
+        "create + delete cancels out",
+        merge_events(created(1, title="Gone"), deleted(1)) is None
+    ))
+    results.append(check(
+        "update + delete keeps the delete",
+        merge_events(delta("goal_updated", 1, {"title": "New"}), deleted(1)) == deleted(1)
+    ))
+
+    merged = merge_events(
+        delta("progress_updated", 1, {"progress_percentage": 20, "status": "active"}, [{"id": 1}]),
+        delta("goal_updated", 1, {"title": "Renamed", "progress_percentage": 30})
+    )
+    results.append(check(
+        "delta + delta combines changes (later wins) and keeps progress_updated",
+        merged["type"] == "progress_updated"
+        and merged["data"]["changes"] == {"progress_percentage": 30, "status": "active", "title": "Renamed"}
+        and merged["data"]["entries"] == [{"id": 1}]
+    ))
+
+    merged = merge_events(
+        delta("progress_updated", 1, {"progress_percentage": 20}, [{"id": 1}]),
+        delta("progress_updated", 1, {"progress_percentage": 60}, [{"id": 2}, {"id": 3}])
+    )
+    results.append(check(
+        "delta entries are combined newest first",
+        merged["data"]["entries"] == [{"id": 2}, {"id": 3}, {"id": 1}]
+    ))
+
+    merged = merge_events(delta("goal_updated", 1, {"title": "A"}), delta("goal_updated", 1, {"category": "B"}))
+    results.append(check(
+        "goal_updated deltas without entries stay goal_updated",
+        merged["type"] == "goal_updated"
+        and merged["data"]["changes"] == {"title": "A", "category": "B"}
+        and "entries" not in merged["data"]
+    ))
+
+    results.append(check(
+        "goals_imported counts add up",
+        merge_events(
+            {"type": "goals_imported", "data": {"count": 3}},
+            {"type": "goals_imported", "data": {"count": 4}}
+        )["data"]["count"] == 7
+    ))
+    return all(results)
+
+def test_coalescer_ordering():
+    print("\n📦 Testing Coalescer Ordering")
+    print("=" * 50)
+    published = []
+
+    async def publish(data, topics):
+        published.append((data, topics))
+
+    async def run():
+        coalescer = EventCoalescer(publish, window_ms=10_000)
+        coalescer.add(delta("goal_updated", 1, {"title": "A"}), ["goal:1"])
+        coalescer.add(delta("goal_updated", 2, {"title": "B"}), ["goal:2"])
+        coalescer.add({"type": "stats_updated", "data": {"total_goals": 1}}, ["stats"])
+        coalescer.add(delta("goal_updated", 1, {"category": "C"}), ["goal:1", "category:C"])
+        coalescer.add(created(3, title="Short lived"), ["goal:3"])
+        coalescer.add({"type": "stats_updated", "data": {"total_goals": 2}}, ["stats"])
+        coalescer.add(deleted(3), ["goal:3"])
+        pending = coalescer.pending
+        await coalescer.flush()
+        return coalescer, pending
+
+    coalescer, pending = asyncio.run(run())
+    order = [(data["type"], data["data"].get("goal_id")) for data, _ in published]
+    print(f"📋 Published: {order}")
+    results = [
+        check("one pending event per goal or stats key", pending == 3),
+        check(
+            "a merged event moves to the position of its latest part",
+            order == [("goal_updated", 2), ("goal_updated", 1), ("stats_updated", None)]
+        ),
+        check("merged topics are the union of the parts", published[1][1] == ["goal:1", "category:C"]),
+        check("stats keep only the latest values", published[2][0]["data"] == {"total_goals": 2}),
+        check("counters track received and published events", (coalescer.received, coalescer.published) == (7, 3)),
+    ]
+
+    # A batch event between two updates of its goal must not be overtaken by their merge
+    published.clear()
+
+    async def run_batch():
+        coalescer = EventCoalescer(publish, window_ms=10_000)
+        coalescer.add(delta("goal_updated", 1, {"status": "paused"}), ["goal:1"])
+        coalescer.add({"type": "progress_batch_updated", "data": {"goals": [
+            {"goal_id": 1, "changes": {"status": "completed"}, "entries": []}
+        ]}}, ["goal:1"])
+        coalescer.add(delta("goal_updated", 1, {"title": "Renamed"}), ["goal:1"])
+        coalescer.add(delta("goal_updated", 2, {"title": "Other"}), ["goal:2"])
+        coalescer.add({"type": "goals_deleted", "data": {"goal_ids": [3]}}, ["goal:3"])
+        coalescer.add(delta("goal_updated", 2, {"category": "C"}), ["goal:2"])
+        await coalescer.flush()
+
+    asyncio.run(run_batch())
+    status = None
+    for data, _ in published:
+        if data["type"] == "progress_batch_updated":
+            status = data["data"]["goals"][0]["changes"].get("status", status)
+        elif data["data"].get("goal_id") == 1:
+            status = data["data"]["changes"].get("status", status)
+    order = [(data["type"], data["data"].get("goal_id")) for data, _ in published]
+    print(f"📋 Published: {order}")
+    results += [
+        check(
+            "updates of a goal are not merged across a batch event about it",
+            order[:3] == [("goal_updated", 1), ("progress_batch_updated", None), ("goal_updated", 1)]
+        ),
+        check("the batch's newer status is the one clients end with", status == "completed"),
+        check(
+            "batch events about other goals do not stop merging",
+            order[3:] == [("goals_deleted", None), ("goal_updated", 2)]
+            and published[4][0]["data"]["changes"] == {"title": "Other", "category": "C"}
+        ),
+    ]
+    return all(results)
+
+if __name__ == "__main__":
+    passed = test_merge_rules()
+    passed = test_coalescer_ordering() and passed
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test progress history bucketing and downsampling
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from app.database import SessionLocal, engine
+from app.downsampling import lttb
+from app import migrations, models, schemas, crud, search_index
+
+def check(description, passed):
+    print(f"{'✅' if passed else '❌'} {description}")
+    return passed
+
+def test_lttb():
+    print("📉 Testing LTTB Downsampling")
+    print("=" * 50)
+    xs = list(range(1000))
+    ys = [0.0] * 1000
+    ys[503] = 100.0
+    ys[771] = -50.0
+    kept = lttb(xs, ys, 20)
+    print(f"📋 Kept {len(kept)} of {len(xs)} points")
+    return all([
+        check("keeps exactly threshold points", len(kept) == 20),
+        check("keeps the first and last points", kept[0] == 0 and kept[-1] == 999),
+        check("indices are strictly ascending", all(a < b for a, b in zip(kept, kept[1:]))),
+        check("keeps the peak and the dip", 503 in kept and 771 in kept),
+        check("short series are returned whole", lttb([1, 2, 3], [1, 2, 3], 10) == [0, 1, 2]),
+        check("thresholds below 3 return the whole series", lttb(xs[:5], ys[:5], 2) == [0, 1, 2, 3, 4]),
+    ])
+
+def test_bucketing():
+    print("\n🗓️  Testing History Bucketing")
+    print("=" * 50)
+    migrations.migrate(engine)
+    db = SessionLocal()
+    goal_id = None
+
+    try:
+        db_goal = crud.create_goal(db=db, goal=schemas.GoalCreate(title="Test History Goal", category="Test"))
+        goal_id = db_goal.id
+        entries = [
+            (datetime(2026, 3, 1, 10, 0), 10.0),   # Sunday: belongs to the week of Monday Feb 23
+            (datetime(2026, 3, 2, 9, 0), 20.0),    # Monday
+            (datetime(2026, 3, 4, 18, 0), 30.0),
+            (datetime(2026, 3, 8, 23, 0), 40.0),   # Sunday: last of the week of Mar 2
+            (datetime(2026, 3, 9, 0, 30), 50.0),   # Monday: a new week
+            (datetime(2026, 4, 1, 12, 0), 60.0),
+            (datetime(2026, 4, 2, 12, 0), None),   # Unscored entries are not history
+        ]
+        db_entries = [
+            models.ProgressEntry(goal_id=goal_id, text="Update", progress_percentage=value, created_at=created_at)
+            for created_at, value in entries
+        ]
+        db.add_all(db_entries)
+        db.flush()
+        # Written around crud to backdate them, so index them the way crud would
+        search_index.index_entries(db, db_entries)
+        db.commit()
+
+        def history(**filters):
+            return [tuple(row) for row in crud.get_progress_history(db, goal_id, **filters)]
+
+        weeks = history(bucket="week")
+        months = history(bucket="month")
+        print(f"📋 Weeks: {[(row[0].date().isoformat(), row[1], row[3]) for row in weeks]}")
+        results = [
+            check("raw history has one row per scored entry", len(history()) == 6),
+            check("weeks start on Monday and keep the last value", weeks == [
+                (datetime(2026, 2, 23), 10.0, 10.0, 1),
+                (datetime(2026, 3, 2), 40.0, 30.0, 3),
+                (datetime(2026, 3, 9), 50.0, 50.0, 1),
+                (datetime(2026, 3, 30), 60.0, 60.0, 1),
+            ]),
+            check("months start on the first", months == [
+                (datetime(2026, 3, 1), 50.0, 30.0, 5),
+                (datetime(2026, 4, 1), 60.0, 60.0, 1),
+            ]),
+            check("from/to limit the entries before bucketing", history(
+                bucket="month", start=datetime(2026, 3, 2), end=datetime(2026, 3, 8, 23, 59)
+            ) == [(datetime(2026, 3, 1), 40.0, 30.0, 3)]),
+            check("missing goals return None", crud.get_progress_history(db, -1) is None),
+        ]
+        try:
+            crud.get_progress_history(db, goal_id, bucket="year")
+            results.append(check("unknown buckets are rejected", False))
+        except ValueError:
+            results.append(check("unknown buckets are rejected", True))
+        return all(results)
+
+    except Exception as e:
+        print(f"❌ Error during history test: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        if goal_id is not None:
+            crud.delete_goal(db=db, goal_id=goal_id)
+        db.close()
+
+if __name__ == "__main__":
+    passed = test_lttb()
+    passed = test_bucketing() and passed
+    sys.exit(0 if passed else 1)
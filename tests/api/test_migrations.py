@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test upgrading a version 1 database that already holds data
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_db_engine
+from app import migrations, crud
+
+def count(connection, table):
+    return connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+def test_upgrade_from_version_1():
+    print("🗄️  Testing Migration Upgrade")
+    print("=" * 50)
+
+    directory = tempfile.mkdtemp()
+    engine, _ = create_db_engine(f"sqlite:///{os.path.join(directory, 'upgrade.db')}")
+
+    try:
+        print("📝 Creating a version 1 database with data...")
+        migrations.migrate(engine, target=1)
+        with engine.connect() as connection:
+            # Version 1 never enforced the foreign key, so entries could outlive their goal
+            connection.execute(text("PRAGMA foreign_keys=OFF"))
+            connection.execute(text(
+                "INSERT INTO goals (id, title, category, progress_percentage, status) VALUES "
+                "(1, 'Run a marathon', 'Health', 30, 'active'), (2, 'Read 12 books', 'Learning', 0, 'active')"
+            ))
+            connection.execute(text(
+                "INSERT INTO progress_entries (id, goal_id, text, progress_percentage) VALUES "
+                "(1, 1, 'Ran 5k', 10), (2, 1, 'Ran 10k', 20), (3, 1, 'Ran 15k', 30), "
+                "(4, 2, 'Started a book', 0), (5, 99, 'Entry of a deleted goal', 50)"
+            ))
+            connection.commit()
+        # Don't hand the connection without foreign keys back to later steps
+        engine.dispose()
+
+        print("🔧 Applying the remaining migrations...")
+        applied = migrations.migrate(engine)
+        print(f"📋 Applied: {applied}")
+
+        with engine.connect() as connection:
+            goals, entries = count(connection, "goals"), count(connection, "progress_entries")
+            foreign_keys = inspect(connection).get_foreign_keys("progress_entries")
+            indexes = {index["name"] for index in inspect(connection).get_indexes("progress_entries")}
+        print(f"📋 Goals: {goals}, progress entries: {entries}")
+        upgraded = (
+            applied == [2, 3, 4]
+            and goals == 2
+            # Only the orphaned entry was dropped
+            and entries == 4
+            and foreign_keys[0]["options"].get("ondelete") == "CASCADE"
+            and {"ix_progress_entries_id", "ix_progress_entries_goal_id_created_at"} <= indexes
+        )
+
+        print("🗑️  Deleting a goal...")
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            crud.ensure_statistics(db)
+            db.commit()
+            deleted = crud.delete_goal(db=db, goal_id=1)
+        with engine.connect() as connection:
+            remaining = connection.execute(text("SELECT goal_id FROM progress_entries")).scalars().all()
+            # The database itself cascades, not just the crud layer
+            connection.execute(text("DELETE FROM goals WHERE id = 2"))
+            connection.commit()
+            cascaded = count(connection, "progress_entries") == 0
+        print(f"📋 Entries left after deleting goal 1: {remaining}")
+
+        if upgraded and deleted and remaining == [2] and cascaded:
+            print("🎉 Version 1 database upgraded with its data intact!")
+            return True
+        else:
+            print("❌ Upgraded database does not have the expected rows!")
+            return False
+
+    except Exception as e:
+        print(f"❌ Error during migration test: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        engine.dispose()
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(0 if test_upgrade_from_version_1() else 1)
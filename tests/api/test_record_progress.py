@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test the single-transaction progress write path
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from sqlalchemy import inspect
+
+from app.database import SessionLocal, engine
+from app import migrations, schemas, crud
+
+def test_record_progress():
+    print("📈 Testing Progress Unit of Work")
+    print("=" * 50)
+    
+    migrations.migrate(engine)
+    db = SessionLocal()
+    goal_id = None
+    
+    try:
+        print("📝 Creating test goal...")
+        db_goal = crud.create_goal(db=db, goal=schemas.GoalCreate(
+            title="Test Progress Goal",
+            category="Test"
+        ))
+        goal_id = db_goal.id
+        
+        print("📊 Recording two progress updates...")
+        for percentage in (40.0, 100.0):
+            db_progress, updated_goal = crud.record_progress(db=db, progress=schemas.ProgressEntryCreate(
+                goal_id=goal_id,
+                text=f"{percentage:.0f}% done",
+                progress_percentage=percentage,
+                sentiment="neutral"
+            ))
+        
+        print(f"📋 Goal progress: {updated_goal.progress_percentage}, status: {updated_goal.status}")
+        
+        # A fresh session sees exactly what the unit of work returned
+        check = SessionLocal()
+        try:
+            stored_goal = crud.get_goal(check, goal_id)
+            stored_entries = crud.get_progress_entries(check, goal_id)
+            consistent = (
+                stored_goal.progress_percentage == 100.0
+                and stored_goal.status == "completed"
+                and updated_goal.progress_percentage == 100.0
+                and updated_goal.status == "completed"
+                and len(stored_entries) == 2
+                # The goal's entry history is never loaded by an update
+                and "progress_entries" in inspect(updated_goal).unloaded
+                and stored_entries[0].id == db_progress.id
+            )
+        finally:
+            check.close()
+        
+        if consistent:
+            print("🎉 Progress entry and goal were written together!")
+            return True
+        else:
+            print("❌ Stored goal does not match the returned goal!")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Error during progress test: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        if goal_id is not None:
+            crud.delete_goal(db=db, goal_id=goal_id)
+        db.close()
+
+def test_backdated_batch():
+    print("\n🕰️  Testing Backdated Progress Batch")
+    print("=" * 50)
+    
+    migrations.migrate(engine)
+    db = SessionLocal()
+    goal_ids = []
+    
+    try:
+        for title in ("Test Backdated Goal", "Test Fresh Goal"):
+            goal_ids.append(crud.create_goal(db=db, goal=schemas.GoalCreate(title=title, category="Test")).id)
+        tracked, fresh = goal_ids
+        crud.record_progress(db=db, progress=schemas.ProgressEntryCreate(
+            goal_id=tracked, text="Current state", progress_percentage=60.0
+        ))
+        
+        print("📦 Syncing offline updates older than the goal's latest entry...")
+        crud.record_progress_batch(db, [
+            schemas.ProgressEntryCreate(
+                goal_id=tracked, text="Offline finish", progress_percentage=100.0, created_at=datetime(2020, 1, 2)
+            ),
+            schemas.ProgressEntryCreate(
+                goal_id=tracked, text="Offline start", progress_percentage=90.0, created_at=datetime(2020, 1, 1)
+            ),
+            # A goal without entries takes the newest of the batch, however old
+            schemas.ProgressEntryCreate(
+                goal_id=fresh, text="Offline only", progress_percentage=30.0, created_at=datetime(2020, 1, 1)
+            ),
+        ])
+        
+        check = SessionLocal()
+        try:
+            stored = {goal_id: crud.get_goal(check, goal_id) for goal_id in goal_ids}
+            entries = len(crud.get_progress_entries(check, tracked))
+        finally:
+            check.close()
+        print(f"📋 Backdated goal: {stored[tracked].progress_percentage} ({stored[tracked].status}), {entries} entries")
+        
+        kept = (
+            stored[tracked].progress_percentage == 60.0
+            and stored[tracked].status == "active"
+            and entries == 3
+            and stored[fresh].progress_percentage == 30.0
+        )
+        
+        print("📦 Syncing one old and one new update...")
+        crud.record_progress_batch(db, [
+            schemas.ProgressEntryCreate(goal_id=tracked, text="Newer", progress_percentage=75.0),
+            schemas.ProgressEntryCreate(
+                goal_id=tracked, text="Older", progress_percentage=10.0, created_at=datetime(2020, 1, 3)
+            ),
+        ])
+        check = SessionLocal()
+        try:
+            advanced = crud.get_goal(check, tracked).progress_percentage == 75.0
+        finally:
+            check.close()
+        
+        if kept and advanced:
+            print("🎉 Old updates were stored without rolling progress back!")
+            return True
+        else:
+            print("❌ Backdated updates changed the goal's progress!")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Error during backdated batch test: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        crud.delete_goals(db, ids=goal_ids)
+        db.close()
+
+if __name__ == "__main__":
+    passed = test_record_progress()
+    passed = test_backdated_batch() and passed
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test the response cache: ETags, 304s and invalidation
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from fastapi.testclient import TestClient
+
+from app.response_cache import DASHBOARD_TAG, ResponseCache, etag_matches, goal_tag
+
+def check(description, passed):
+    print(f"{'✅' if passed else '❌'} {description}")
+    return passed
+
+def test_etag_matching():
+    print("🏷️  Testing If-None-Match Parsing")
+    print("=" * 50)
+    etag = '"abc123"'
+    return all([
+        check("exact tag", etag_matches('"abc123"', etag)),
+        check("weak tag", etag_matches('W/"abc123"', etag)),
+        check("tag in a list", etag_matches('"old", W/"abc123" , "other"', etag)),
+        check("wildcard", etag_matches(" * ", etag)),
+        check("other tags", not etag_matches('"abc1234", "abc12"', etag)),
+        check("unquoted tag", not etag_matches("abc123", etag)),
+        check("commas inside a tag", etag_matches('"x,y", "abc123"', etag) and not etag_matches('"abc123,x"', etag)),
+        check("missing header", not etag_matches(None, etag) and not etag_matches("", etag)),
+    ])
+
+def test_cache():
+    print("\n🗃️  Testing Cache Invalidation")
+    print("=" * 50)
+    cache = ResponseCache(max_size=100, ttl=None)
+    builds = []
+
+    async def run():
+        async def build():
+            builds.append(1)
+            return b'{"goal": 1}'
+
+        first = await cache.get_or_build((goal_tag(1), None), build)
+        again = await cache.get_or_build((goal_tag(1), None), build)
+        await cache.get_or_build((goal_tag(2), None), build)
+        await cache.get_or_build((DASHBOARD_TAG, "full", None), build)
+        results = [
+            check("a hit is served without building", len(builds) == 3 and again == first),
+            check("the ETag is a quoted hash of the body", first.etag.startswith('"') and first.etag.endswith('"')),
+        ]
+
+        cache.invalidate_goals(1)
+        results.append(check(
+            "invalidating a goal drops it and the dashboard only",
+            cache.get((goal_tag(1), None)) is None
+            and cache.get((DASHBOARD_TAG, "full", None)) is None
+            and cache.get((goal_tag(2), None)) is not None
+        ))
+
+        # A write lands while the body is being read: serve it, but don't keep it
+        async def racing_build():
+            cache.invalidate_goals(3)
+            return b'{"goal": 3, "stale": true}'
+
+        served = await cache.get_or_build((goal_tag(3), None), racing_build)
+        results.append(check(
+            "a body built across an invalidation is served but not stored",
+            served.body == b'{"goal": 3, "stale": true}' and cache.get((goal_tag(3), None)) is None
+        ))
+
+        cache.clear()
+        results.append(check("clear drops everything", cache.get((goal_tag(2), None)) is None))
+        return results
+
+    return all(asyncio.run(run()))
+
+def test_event_invalidation():
+    print("\n📡 Testing Invalidation From Broadcast Events")
+    print("=" * 50)
+    from app.main import invalidate_for_event, response_cache
+
+    def fill():
+        response_cache.clear()
+        for key in [(goal_tag(1), None), (goal_tag(2), None), (goal_tag(3), None), (DASHBOARD_TAG, "full", None)]:
+            response_cache._cache.set(key, "cached")
+
+    def cached():
+        return {key[0] for key in response_cache._cache.keys()}
+
+    results = []
+    cases = [
+        ("goal event", {"type": "goal_updated", "data": {"goal_id": 1, "changes": {}}}, {"goal:2", "goal:3"}),
+        ("bulk delete", {"type": "goals_deleted", "data": {"goal_ids": [1, 2]}}, {"goal:3"}),
+        ("progress batch", {"type": "progress_batch_updated", "data": {"goals": [{"goal_id": 3}]}}, {"goal:1", "goal:2"}),
+        ("statistics only", {"type": "stats_updated", "data": {}}, {"goal:1", "goal:2", "goal:3", DASHBOARD_TAG}),
+        ("lost events", {"type": "resync_required", "data": {}}, set()),
+    ]
+    for description, event, remaining in cases:
+        fill()
+        invalidate_for_event(event)
+        results.append(check(f"{description} leaves {sorted(remaining) or 'nothing'}", cached() == remaining))
+    response_cache.clear()
+    return all(results)
+
+def test_not_modified():
+    print("\n🔁 Testing 304 Responses")
+    print("=" * 50)
+    from app.main import app
+
+    with TestClient(app) as client:
+        goal_id = client.post("/goals", json={"title": "Test Cache Goal", "category": "Test"}).json()["id"]
+        try:
+            response = client.get(f"/goals/{goal_id}")
+            etag = response.headers["etag"]
+
+            def status(if_none_match):
+                return client.get(f"/goals/{goal_id}", headers={"If-None-Match": if_none_match}).status_code
+
+            results = [
+                check("matching tag gets 304", status(etag) == 304),
+                check("weak tag gets 304", status(f"W/{etag}") == 304),
+                check("tag list gets 304", status(f'"stale", {etag}') == 304),
+                check("wildcard gets 304", status("*") == 304),
+                check("other tag gets the body", status('"stale"') == 200),
+            ]
+
+            client.put(f"/goals/{goal_id}", json={"title": "Test Cache Goal Renamed"})
+            updated = client.get(f"/goals/{goal_id}", headers={"If-None-Match": etag})
+            results.append(check(
+                "a write changes the body and its ETag",
+                updated.status_code == 200
+                and updated.json()["title"] == "Test Cache Goal Renamed"
+                and updated.headers["etag"] != etag
+            ))
+            return all(results)
+        finally:
+            client.delete(f"/goals/{goal_id}")
+
+if __name__ == "__main__":
+    passed = test_etag_matching()
+    passed = test_cache() and passed
+    passed = test_event_invalidation() and passed
+    passed = test_not_modified() and passed
+    sys.exit(0 if passed else 1)
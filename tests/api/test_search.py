@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test that goal search stays in step with every write and applies its filters
+"""
+
+import sys
+import os
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app import migrations, schemas, crud, search_index
+
+# Made-up words, so rows left by other tests cannot match
+CATEGORY = "Test Search"
+
+def check(description, passed):
+    print(f"{'✅' if passed else '❌'} {description}")
+    return passed
+
+def found(db, q, **filters):
+    return [row.id for row in crud.search_goals(db, q=q, limit=100, **filters)]
+
+def index_intact(db):
+    """FTS5's own consistency check against the base tables"""
+    try:
+        for table in ("goals_fts", "progress_fts"):
+            db.execute(text(f"INSERT INTO {table}({table}, rank) VALUES ('integrity-check', 1)"))
+        return True
+    except Exception as e:
+        print(f"   {e}")
+        return False
+
+def test_search():
+    print("🔍 Testing Search Index Sync")
+    print("=" * 50)
+    migrations.migrate(engine)
+    db = SessionLocal()
+    goal_ids = []
+
+    try:
+        def create(title, **fields):
+            goal_ids.append(crud.create_goal(db=db, goal=schemas.GoalCreate(
+                title=title, category=fields.pop("category", CATEGORY), **fields
+            )).id)
+            return goal_ids[-1]
+
+        alpha = create("Zorblax marathon", description="Train for the qwindle race")
+        results = [
+            check("a created goal is found by title", found(db, "zorblax") == [alpha]),
+            check("and by description", found(db, "qwindle") == [alpha]),
+            check("the last word matches as a prefix", found(db, "zorbl") == [alpha]),
+        ]
+
+        crud.update_goal(db, alpha, schemas.GoalUpdate(title="Flumox marathon"))
+        results += [
+            check("an updated title is found", found(db, "flumox") == [alpha]),
+            check("the old title no longer is", found(db, "zorblax") == []),
+        ]
+
+        crud.record_progress(db, schemas.ProgressEntryCreate(goal_id=alpha, text="Ran the grelping loop", progress_percentage=40))
+        beta = create("Second goal", category=f"{CATEGORY} Other")
+        crud.record_progress_batch(db, [
+            schemas.ProgressEntryCreate(goal_id=beta, text="Practiced grelping scales", progress_percentage=80),
+            schemas.ProgressEntryCreate(goal_id=alpha, text="Another vintrop session", progress_percentage=50),
+        ])
+        db.commit()
+        rows = crud.search_goals(db, q="grelping", limit=100)
+        gamma = create("Grelping lessons", category=f"{CATEGORY} Titles")
+        results += [
+            check("recorded progress text is found", {row.id for row in rows} == {alpha, beta}),
+            check("entry matches are counted", all(row.entry_matches == 1 for row in rows)),
+            check("batch progress text is found", found(db, "vintrop") == [alpha]),
+            check("title matches rank above entry matches", found(db, "grelping")[0] == gamma),
+        ]
+
+        results += [
+            check("category filter", found(db, "grelping", category=CATEGORY) == [alpha]),
+            check("min_progress filter", found(db, "grelping", min_progress=60) == [beta]),
+            check("status filter", found(db, "grelping", status="completed") == []),
+            check("the index matches its tables", index_intact(db)),
+        ]
+
+        # Goals whose matching entries all fall outside the scored candidates are still found
+        old = create("Older goal")
+        crud.record_progress(db, schemas.ProgressEntryCreate(goal_id=old, text="Went snarfling", progress_percentage=10))
+        newer = create("Newer goal")
+        for number in range(6):
+            crud.record_progress(db, schemas.ProgressEntryCreate(goal_id=newer, text=f"Snarfling again {number}"))
+        candidates, search_index.SEARCH_ENTRY_CANDIDATES = search_index.SEARCH_ENTRY_CANDIDATES, 3
+        try:
+            rows = crud.search_goals(db, q="snarfling", limit=100)
+            paged = found(db, "snarfling") == [newer, old] and [
+                row.id for offset in (0, 1) for row in crud.search_goals(db, q="snarfling", limit=1, offset=offset)
+            ] == [newer, old]
+        finally:
+            search_index.SEARCH_ENTRY_CANDIDATES = candidates
+        results += [
+            check("goals with only unscored matches are still returned, last", paged),
+            check("entry matches count every matching entry", [row.entry_matches for row in rows] == [6, 1]),
+        ]
+
+        crud.delete_goals(db, ids=[alpha, beta, gamma])
+        results += [
+            check("deleted goals are gone from the index", found(db, "flumox") == [] and found(db, "grelping") == []),
+            check("the index still matches its tables", index_intact(db)),
+        ]
+        return all(results)
+
+    except Exception as e:
+        print(f"❌ Error during search test: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        db.rollback()
+        crud.delete_goals(db, ids=goal_ids)
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(0 if test_search() else 1)
@@ -70,10 +70,10 @@ def test_models():
     
     try:
         from app.database import engine
-        from app import models
+        from app import migrations
         
-        # Create tables
-        models.Base.metadata.create_all(bind=engine)
+        # Create tables the way the app does
+        migrations.migrate(engine)
         print("✅ Models and tables created successfully")
         
         # List created tables
@@ -96,18 +96,19 @@ def main():
     
     # Test 1: Direct SQLite
     if not test_sqlite_direct():
-        return
+        return False
     
     # Test 2: SQLAlchemy connection
     if not test_sqlalchemy_connection():
-        return
+        return False
     
     # Test 3: Model creation
     if not test_models():
-        return
+        return False
     
     print("\n🎉 All database tests passed!")
     print("✅ Database is ready for the Goal Tracker application")
+    return True
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(0 if main() else 1)
\ No newline at end of file
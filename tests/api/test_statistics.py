@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test that the incrementally maintained statistics match a full rebuild
+"""
+
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from app.database import SessionLocal, engine
+from app import migrations, schemas, crud
+
+def test_statistics_counters():
+    print("📊 Testing Statistics Counters")
+    print("=" * 50)
+    
+    migrations.migrate(engine)
+    db = SessionLocal()
+    created_ids = []
+    
+    try:
+        crud.ensure_statistics(db)
+        before = crud.get_goal_statistics(db)
+        print(f"📋 Statistics before: {before}")
+        
+        # Exercise every write path that maintains the counters
+        print("📝 Creating, updating and deleting test goals...")
+        for i in range(3):
+            db_goal = crud.create_goal(db=db, goal=schemas.GoalCreate(
+                title=f"Stats Test Goal {i}",
+                category="Stats Test"
+            ))
+            created_ids.append(db_goal.id)
+        
+        crud.update_goal_progress(db=db, goal_id=created_ids[0], progress=100.0)
+        crud.update_goal(db=db, goal_id=created_ids[1], goal_update=schemas.GoalUpdate(
+            category="Stats Test Moved",
+            status="paused"
+        ))
+        crud.delete_goal(db=db, goal_id=created_ids.pop())
+        
+        incremental = crud.get_goal_statistics(db)
+        rebuilt = crud.rebuild_statistics(db)
+        print(f"📋 Incremental statistics: {incremental}")
+        print(f"📋 Rebuilt statistics:     {rebuilt}")
+        
+        if incremental == rebuilt and incremental["total_goals"] == before["total_goals"] + 2:
+            print("🎉 Statistics counters match a full rebuild!")
+            return True
+        else:
+            print("❌ Statistics counters drifted from the goals table!")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Error during statistics test: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        for goal_id in created_ids:
+            crud.delete_goal(db=db, goal_id=goal_id)
+        db.close()
+
+def test_concurrent_statistics():
+    print("\n📊 Testing Statistics Counters Under Concurrent Writes")
+    print("=" * 50)
+    
+    migrations.migrate(engine)
+    db = SessionLocal()
+    created_ids = []
+    
+    try:
+        for i in range(3):
+            db_goal = crud.create_goal(db=db, goal=schemas.GoalCreate(
+                title=f"Concurrent Stats Goal {i}",
+                category="Stats Test"
+            ))
+            created_ids.append(db_goal.id)
+        
+        def write(n):
+            # Each write uses its own session and connection, like overlapping requests
+            goal_id = created_ids[n % len(created_ids)]
+            with SessionLocal() as session:
+                if n % 3 == 2:
+                    crud.update_goal(session, goal_id, schemas.GoalUpdate(
+                        status="paused" if n % 2 else "active",
+                        category=f"Stats Test {n % 4}"
+                    ))
+                else:
+                    crud.record_progress(session, schemas.ProgressEntryCreate(
+                        goal_id=goal_id,
+                        text=f"concurrent update {n}",
+                        progress_percentage=float(n % 101)
+                    ))
+        
+        print("📝 Running 90 overlapping progress and goal updates on 3 goals...")
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            list(pool.map(write, range(90)))
+        
+        incremental = crud.get_goal_statistics(db)
+        rebuilt = crud.rebuild_statistics(db)
+        print(f"📋 Incremental statistics: {incremental}")
+        print(f"📋 Rebuilt statistics:     {rebuilt}")
+        
+        if incremental == rebuilt:
+            print("🎉 Statistics counters survive concurrent writes!")
+            return True
+        else:
+            print("❌ Concurrent writes applied deltas from stale goal state!")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Error during concurrent statistics test: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        for goal_id in created_ids:
+            crud.delete_goal(db=db, goal_id=goal_id)
+        db.close()
+
+if __name__ == "__main__":
+    results = [test_statistics_counters(), test_concurrent_statistics()]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hot queries before and after the query indexes (migration 2)
+
+Builds a throwaway SQLite database at schema version 1, fills it with
+sample goals and progress entries, then prints the query plan and timing
+of each query pattern the API uses. The remaining migrations are applied
+and the same queries are measured again.
+
+Usage: python tests/debug/benchmark_query_plans.py [goals] [entries_per_goal]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from sqlalchemy import create_engine, text
+
+from app import migrations
+
+STATUSES = ["active", "completed", "paused", "cancelled"]
+CATEGORIES = ["Health", "Learning", "Career", "Finance", None]
+
+# The SQL the crud functions issue, with representative parameters
+QUERIES = {
+    "entries of a goal (get_progress_entries)":
+        ("SELECT * FROM progress_entries WHERE goal_id = :goal_id ORDER BY created_at DESC", {"goal_id": 42}),
+    "latest entries per goal (entries_limit)":
+        ("SELECT id FROM (SELECT id, ROW_NUMBER() OVER (PARTITION BY goal_id ORDER BY created_at DESC, id DESC) AS rn "
+         "FROM progress_entries WHERE goal_id IN (1, 2, 3, 4, 5)) WHERE rn <= 3", {}),
+    "delete a goal's entries (delete_goal)":
+        ("DELETE FROM progress_entries WHERE goal_id = :goal_id", {"goal_id": -1}),
+    "goals by status (GET /goals?status=)":
+        ("SELECT * FROM goals WHERE status = :status ORDER BY created_at, id LIMIT 50", {"status": "paused"}),
+    "goals by status and category":
+        ("SELECT * FROM goals WHERE status = :status AND category = :category ORDER BY created_at, id LIMIT 50",
+         {"status": "paused", "category": "Finance"}),
+    "status counts (rebuild_statistics)":
+        ("SELECT status, count(*) FROM goals GROUP BY status", {}),
+    "next page (keyset pagination)":
+        ("SELECT * FROM goals WHERE (created_at, id) > (:created_at, :id) "
+         "ORDER BY created_at, id LIMIT 50", {"created_at": datetime(2024, 1, 5), "id": 0}),
+}
+
+def seed(engine, goals, entries_per_goal):
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO goals (id, title, category, status, progress_percentage, created_at, updated_at) "
+            "VALUES (:id, :title, :category, :status, 0, :created_at, :created_at)"
+        ), [
+            {
+                "id": goal_id,
+                "title": f"Goal {goal_id}",
+                "category": random.choice(CATEGORIES),
+                "status": random.choice(STATUSES),
+                "created_at": start + timedelta(minutes=goal_id),
+            }
+            for goal_id in range(1, goals + 1)
+        ])
+        conn.execute(text(
+            "INSERT INTO progress_entries (goal_id, text, progress_percentage, sentiment, created_at) "
+            "VALUES (:goal_id, 'made progress', 50, 'neutral', :created_at)"
+        ), [
+            {"goal_id": random.randint(1, goals), "created_at": start + timedelta(seconds=n)}
+            for n in range(goals * entries_per_goal)
+        ])
+
+def measure(engine, label, repeat=20):
+    print(f"\n📊 {label}")
+    print("=" * 60)
+    # Fresh planner statistics for whichever indexes exist
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    with engine.connect() as conn:
+        for name, (sql, params) in QUERIES.items():
+            plan = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params).fetchall()
+            started = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(text(sql), params)
+            elapsed = (time.perf_counter() - started) / repeat * 1000
+            print(f"\n🔍 {name}: {elapsed:.2f} ms")
+            for row in plan:
+                print(f"   {row[-1]}")
+            conn.rollback()
+
+def main():
+    goals = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    entries_per_goal = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        migrations.migrate(engine, target=1)
+        print(f"🔧 Seeding {goals} goals and {goals * entries_per_goal} progress entries...")
+        seed(engine, goals, entries_per_goal)
+
+        measure(engine, "Before: schema version 1")
+        applied = migrations.migrate(engine)
+        measure(engine, f"After: applied migrations {applied}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,18 @@ import os
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 
+def fetch_all_goals(base_url):
+    """Follow next_cursor through every page of GET /goals"""
+    goals = []
+    cursor = None
+    while True:
+        params = {"cursor": cursor} if cursor else {}
+        page = requests.get(f"{base_url}/goals", params=params).json()
+        goals.extend(page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return goals
+
 def test_single_goal_creation():
     """Test creating a single goal and check for duplicates"""
     print("🔍 Testing Single Goal Creation")
@@ -22,8 +34,7 @@ def test_single_goal_creation():
     
     # Get initial goal count
     try:
-        response = requests.get(f"{base_url}/goals")
-        initial_goals = response.json()
+        initial_goals = fetch_all_goals(base_url)
         initial_count = len(initial_goals)
         print(f"📊 Initial goal count: {initial_count}")
     except Exception as e:
@@ -63,8 +74,7 @@ def test_single_goal_creation():
     
     # Check final goal count
     try:
-        response = requests.get(f"{base_url}/goals")
-        final_goals = response.json()
+        final_goals = fetch_all_goals(base_url)
         final_count = len(final_goals)
         print(f"\n📊 Final goal count: {final_count}")
         print(f"📈 Goals added: {final_count - initial_count}")
@@ -61,7 +61,55 @@ def main():
         "Delete Functionality Test"
     ))
     
-    # Test 3: API Endpoints (requires server)
+    # Test 3: Statistics counters
+    results.append(run_command(
+        "python api/test_statistics.py",
+        "Statistics Counters Test"
+    ))
+    
+    # Test 4: Progress unit of work
+    results.append(run_command(
+        "python api/test_record_progress.py",
+        "Progress Unit of Work Test"
+    ))
+    
+    # Test 5: Schema migrations
+    results.append(run_command(
+        "python api/test_migrations.py",
+        "Migration Upgrade Test"
+    ))
+    
+    # Test 6: Event coalescing
+    results.append(run_command(
+        "python api/test_event_coalescer.py",
+        "Event Coalescer Test"
+    ))
+    
+    # Test 7: Progress history
+    results.append(run_command(
+        "python api/test_history.py",
+        "Progress History Test"
+    ))
+    
+    # Test 8: Pagination cursors
+    results.append(run_command(
+        "python api/test_cursors.py",
+        "Pagination Cursor Test"
+    ))
+    
+    # Test 9: Search index
+    results.append(run_command(
+        "python api/test_search.py",
+        "Search Index Test"
+    ))
+    
+    # Test 10: Response cache
+    results.append(run_command(
+        "python api/test_response_cache.py",
+        "Response Cache Test"
+    ))
+    
+    # Test 11: API Endpoints (requires server)
     print("\n⚠️  API tests require the server to be running on port 8000")
     print("   Start server with: python debug/debug_start.py")
     
@@ -11,6 +11,15 @@ export interface Goal {
   progress_entries: ProgressEntry[]
 }
 
+export interface GoalSummary {
+  id: number
+  title: string
+  category?: string
+  status: string
+  progress_percentage: number
+  updated_at: string
+}
+
 export interface ProgressEntry {
   id: number
   goal_id: number
@@ -21,6 +30,39 @@ export interface ProgressEntry {
   created_at: string
 }
 
+// Payload of delta events: only the fields that changed, plus any new entries
+export interface GoalDelta {
+  goal_id: number
+  changes: Partial<Goal>
+  entries?: ProgressEntry[]
+}
+
+// GET /goals/search: summaries ranked by match (lower rank is better)
+export interface GoalSearchHit extends GoalSummary {
+  rank: number
+  entry_matches: number
+}
+
+export interface GoalSearchPage {
+  items: GoalSearchHit[]
+  next_offset?: number | null
+}
+
+// GET /goals/{id}/history: one point per entry, or per day/week/month bucket
+export interface HistoryPoint {
+  timestamp: string
+  value: number
+  average: number
+  count: number
+}
+
+export interface GoalHistory {
+  goal_id: number
+  bucket?: 'day' | 'week' | 'month'
+  total_points: number
+  points: HistoryPoint[]
+}
+
 export interface DashboardStats {
   total_goals: number
   completed_goals: number